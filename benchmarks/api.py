@@ -0,0 +1,366 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+directory = tempfile.mkdtemp(prefix="pollify-benchmark-")
+os.environ.setdefault(
+    "DATABASE", f"sqlite+aiosqlite:///{directory}/benchmark.db?timeout=60"
+)
+os.environ.setdefault("SECRET", "benchmark")
+os.environ.setdefault("PORT", "0")
+os.environ.setdefault("ROOT_PATH", "")
+os.environ.setdefault("RATE_LIMIT", "false")
+
+import httpx
+import uvicorn
+from websockets.client import WebSocketClientProtocol, connect
+
+from benchmarks.serializable import large_poll
+from main import app
+from models import poll
+
+Request = Callable[[int], Awaitable[None]]
+P99_SAMPLES = 100
+
+
+@dataclass
+class Result:
+    count: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples: list[float], seconds: float) -> Result:
+    return Result(
+        count=len(samples),
+        seconds=seconds,
+        throughput=len(samples) / seconds,
+        p50_ms=percentile(samples, 0.5) * 1000,
+        p99_ms=percentile(samples, 0.99) * 1000,
+    )
+
+
+async def measure(count: int, concurrency: int, request: Request) -> Result:
+    samples: list[float] = []
+    indexes = iter(range(count))
+
+    async def worker() -> None:
+        for index in indexes:
+            start = perf_counter()
+            await request(index)
+            samples.append(perf_counter() - start)
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, perf_counter() - start)
+
+
+def check(response: httpx.Response) -> httpx.Response:
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.request.url}: {response.text}")
+    return response
+
+
+def text_poll(questions: int) -> dict[str, Any]:
+    return poll.PollSchema(
+        name="Benchmark text",
+        plots=[
+            poll.WordCloudPlot(
+                name="Words",
+                questions=[
+                    poll.TextQuestion(label=f"Question {q}") for q in range(questions)
+                ],
+            )
+        ],
+    ).serializable()
+
+
+def question_ids(created: dict[str, Any]) -> list[str]:
+    return [
+        question["question_id"]
+        for plot in created["poll"]["plots"]
+        for question in plot["questions"]
+    ]
+
+
+class Benchmark:
+    def __init__(self, client: httpx.AsyncClient, url: str, quick: bool) -> None:
+        self.client = client
+        self.url = url
+        self.quick = quick
+        self.results: dict[str, Result] = {}
+        self.users = 0
+
+    def scale(self, count: int) -> int:
+        return max(1, count // 10) if self.quick else count
+
+    async def register(self) -> dict[str, str]:
+        self.users += 1
+        token = check(
+            await self.client.post(
+                "/account/register",
+                json={"username": f"user{self.users}", "password": "password"},
+            )
+        ).json()["token"]
+        return {"x-token": token}
+
+    def report(self, name: str, result: Result) -> None:
+        self.results[name] = result
+        print(
+            f"{name:32} {result.throughput:10.1f}/s "
+            f"p50 {result.p50_ms:8.2f} ms p99 {result.p99_ms:8.2f} ms",
+            flush=True,
+        )
+
+    async def accounts(self) -> None:
+        offset = self.users
+
+        async def register(index: int) -> None:
+            check(
+                await self.client.post(
+                    "/account/register",
+                    json={"username": f"user{offset + index}", "password": "p"},
+                )
+            )
+
+        async def login(index: int) -> None:
+            check(
+                await self.client.post(
+                    "/account/login",
+                    json={"username": f"user{offset + index}", "password": "p"},
+                )
+            )
+
+        count = self.scale(200)
+        self.report("account/register", await measure(count, 8, register))
+        self.report("account/login", await measure(count, 8, login))
+        self.users += count
+
+    async def polls(self) -> None:
+        headers = await self.register()
+        schema = large_poll().serializable()
+
+        async def add(index: int) -> None:
+            check(await self.client.post("/poll/add", json=schema, headers=headers))
+
+        self.report("poll/add large", await measure(self.scale(50), 4, add))
+
+    async def add_value(self, concurrency: int) -> None:
+        headers = await self.register()
+        created = check(
+            await self.client.post("/poll/add", json=text_poll(4), headers=headers)
+        ).json()
+        questions = question_ids(created)
+
+        async def add(index: int) -> None:
+            check(
+                await self.client.post(
+                    "/answers/add/value",
+                    params={"poll_id": created["id"]},
+                    json={
+                        "question_id": questions[index % len(questions)],
+                        "question_type": poll.QuestionType.text,
+                        "text": f"word {index % 100}",
+                    },
+                )
+            )
+
+        self.report(
+            f"answers/add/value c={concurrency}",
+            await measure(self.scale(1000), concurrency, add),
+        )
+
+    async def get_values(self, size: int, chunk: int = 1000) -> None:
+        headers = await self.register()
+        created = check(
+            await self.client.post("/poll/add", json=text_poll(1), headers=headers)
+        ).json()
+        question = question_ids(created)[0]
+
+        for start in range(0, size, chunk):
+            check(
+                await self.client.post(
+                    "/answers/add/bulk",
+                    params={"poll_id": created["id"]},
+                    json=[
+                        {
+                            "values": [
+                                {
+                                    "question_id": question,
+                                    "question_type": poll.QuestionType.text,
+                                    "text": f"answer {index}",
+                                }
+                            ]
+                        }
+                        for index in range(start, min(size, start + chunk))
+                    ],
+                )
+            )
+
+        async def get(index: int) -> None:
+            check(
+                await self.client.get(
+                    "/answers/get/values",
+                    params={"poll_id": created["id"]},
+                    headers=headers,
+                )
+            )
+
+        count = max(5, self.scale(100000 // size))
+        self.report(f"answers/get/values n={size}", await measure(count, 1, get))
+
+    async def fan_out(self, listeners: int, messages: int) -> None:
+        headers = await self.register()
+        created = check(
+            await self.client.post("/poll/add", json=text_poll(1), headers=headers)
+        ).json()
+        question = question_ids(created)[0]
+        socket_url = (
+            self.url.replace("http", "ws", 1)
+            + f"/answers/listen/values?poll_id={created['id']}"
+        )
+
+        sent: dict[int, float] = {}
+        samples: list[float] = []
+        sockets = [await connect(socket_url) for _ in range(listeners)]
+        for connection in sockets:
+            await connection.recv()
+
+        async def listen(connection: WebSocketClientProtocol) -> None:
+            for _ in range(messages):
+                frame = json.loads(await connection.recv())
+                samples.append(perf_counter() - sent[int(frame["value"]["text"])])
+
+        tasks = [asyncio.create_task(listen(connection)) for connection in sockets]
+        start = perf_counter()
+        for index in range(messages):
+            sent[index] = perf_counter()
+            check(
+                await self.client.post(
+                    "/answers/add/answer",
+                    params={"poll_id": created["id"]},
+                    json={
+                        "values": [
+                            {
+                                "question_id": question,
+                                "question_type": poll.QuestionType.text,
+                                "text": str(index),
+                            }
+                        ]
+                    },
+                )
+            )
+        await asyncio.gather(*tasks)
+        seconds = perf_counter() - start
+
+        for connection in sockets:
+            await connection.close()
+
+        self.report(f"listen/values fan-out n={listeners}", summarize(samples, seconds))
+
+
+def compare(
+    results: dict[str, Result],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> bool:
+    regressed = False
+    print()
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        change = result.throughput / baseline[name]["throughput"] - 1
+        p99_change = result.p99_ms / baseline[name]["p99_ms"] - 1
+        tail = min(result.count, int(baseline[name]["count"])) >= P99_SAMPLES
+        slower = change < -tolerance or (tail and p99_change > tolerance)
+        regressed = regressed or slower
+        print(
+            f"{name:32} throughput {change:+7.1%} "
+            + (f"p99 {p99_change:+7.1%}" if tail else "p99     n/a")
+            + (" REGRESSION" if slower else "")
+        )
+    return regressed
+
+
+def free_port() -> int:
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        port: int = listener.getsockname()[1]
+        return port
+
+
+async def run(arguments: argparse.Namespace) -> dict[str, Result]:
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=None) as client:
+        benchmark = Benchmark(client, url, arguments.quick)
+        await benchmark.accounts()
+        await benchmark.polls()
+        for concurrency in (1, 16, 64):
+            await benchmark.add_value(concurrency)
+        for size in arguments.sizes:
+            await benchmark.get_values(benchmark.scale(size))
+        for listeners in arguments.listeners:
+            await benchmark.fan_out(listeners, benchmark.scale(100))
+
+    server.should_exit = True
+    server.force_exit = True
+    await serving
+    return benchmark.results
+
+
+def main() -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description="Pollify API benchmarks")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1000, 10000, 100000],
+    )
+    parser.add_argument(
+        "--listeners",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[10, 100],
+    )
+    arguments = parser.parse_args()
+
+    results = asyncio.run(run(arguments))
+    with open(arguments.output, "w") as file:
+        json.dump({k: asdict(v) for k, v in results.items()}, file, indent=2)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as file:
+            if compare(results, json.load(file), arguments.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
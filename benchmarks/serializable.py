@@ -0,0 +1,41 @@
+import json
+from timeit import timeit
+
+from models import poll
+
+
+def large_poll(plots: int = 200, questions: int = 5) -> poll.PollSchema:
+    return poll.PollSchema(
+        name="Benchmark",
+        plots=[
+            poll.BarPlot(
+                name=f"Plot {p}",
+                questions=[
+                    poll.SelectorQuestion(
+                        label=f"Question {p}.{q}",
+                        options=[
+                            poll.Option(label=f"Option {o}", image=None)
+                            for o in range(10)
+                        ],
+                    )
+                    for q in range(questions)
+                ],
+            )
+            for p in range(plots)
+        ],
+    )
+
+
+def main(number: int = 20) -> None:
+    schema = large_poll()
+    assert schema.serializable() == json.loads(schema.json())
+
+    before = timeit(lambda: json.loads(schema.json()), number=number) / number
+    after = timeit(schema.serializable, number=number) / number
+    print(f"json round trip: {before * 1000:.2f} ms")
+    print(f"serializable:    {after * 1000:.2f} ms")
+    print(f"speedup:         {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,133 @@
+from time import perf_counter
+from typing import Any
+
 from settings import settings
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from utils import metrics, tracing
+
+checkouts = metrics.Counter("pollify_pool_checkouts_total", "Pool checkouts")
+waits = metrics.Counter(
+    "pollify_pool_wait_seconds_total",
+    "Time spent waiting for a pooled connection",
+)
+overflows = metrics.Counter(
+    "pollify_pool_overflows_total",
+    "Checkouts served by an overflow connection",
+)
+timeouts = metrics.Counter(
+    "pollify_pool_timeouts_total",
+    "Checkouts that timed out waiting for a connection",
+)
+checked_out = metrics.Gauge("pollify_pool_checked_out", "Connections in use")
+
+
+class TimedPool(AsyncAdaptedQueuePool):
+    name = "primary"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            timeouts.inc(pool=self.name)
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            waits.inc(elapsed, pool=self.name)
+            tracing.waited(elapsed)
+
+        checkouts.inc(pool=self.name)
+        if self.checkedout() > self.size():
+            overflows.inc(pool=self.name)
+        return entry
+
+
+class ReplicaPool(TimedPool):
+    name = "replica"
 
-engine = create_async_engine(settings.database)
+
+def create_engine(url: str, pool: type[TimedPool]) -> AsyncEngine:
+    options: dict[str, Any] = {}
+    if url.startswith("postgresql"):
+        options = {
+            "poolclass": pool,
+            "pool_size": settings.pool_size,
+            "max_overflow": settings.pool_overflow,
+            "pool_timeout": settings.pool_timeout,
+            "pool_recycle": settings.pool_recycle,
+            "pool_pre_ping": settings.pool_pre_ping,
+            "connect_args": {
+                "prepared_statement_cache_size": settings.statement_cache_size,
+                "timeout": settings.connect_timeout,
+                "command_timeout": settings.command_timeout,
+            },
+        }
+
+    created = create_async_engine(url, **options)
+    tracing.instrument(created.sync_engine)
+    if isinstance(created.pool, TimedPool):
+        checked_out.track(created.pool.checkedout, pool=pool.name)
+    return created
+
+
+engine = create_engine(settings.database, TimedPool)
 sessions = async_sessionmaker(engine)
+replica = (
+    create_engine(settings.database_replica, ReplicaPool)
+    if settings.database_replica is not None
+    else engine
+)
+replica_sessions = async_sessionmaker(replica)
+init_lock = 0x706F6C6C
+extensions: list[str] = []
+migrations: dict[str, str] = {}
 
 
 class Base(DeclarativeBase):
     pass
 
 
+async def init() -> None:
+    async with engine.begin() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if postgresql:
+            await connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": init_lock}
+            )
+            for extension in extensions:
+                await connection.execute(
+                    text(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+                )
+
+        await connection.run_sync(Base.metadata.create_all)
+
+        if postgresql:
+            await connection.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations "
+                    "(name varchar PRIMARY KEY)"
+                )
+            )
+            applied = set(
+                (
+                    await connection.execute(text("SELECT name FROM schema_migrations"))
+                ).scalars()
+            )
+            for name, migration in migrations.items():
+                if name in applied:
+                    continue
+                await connection.execute(text(migration))
+                await connection.execute(
+                    text("INSERT INTO schema_migrations (name) VALUES (:name)"),
+                    {"name": name},
+                )
+
+
 from .account import User
 from .poll import Poll
-from .answers import Answer
+from .answers import Answer, AnswerValue
+from .results import Result
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Mapped, mapped_column
 
-from database import Base
+from database import Base, migrations
 
 
 class User(Base):
@@ -9,3 +9,7 @@ class User(Base):
     username: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
     salt: Mapped[str]
+    avatar: Mapped[str | None] = mapped_column(default=None)
+
+
+migrations["users_avatar"] = "ALTER TABLE users ADD COLUMN IF NOT EXISTS avatar varchar"
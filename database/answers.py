@@ -1,7 +1,9 @@
-from sqlalchemy import JSON, ForeignKey, UniqueConstraint
+from uuid import UUID
+
+from sqlalchemy import JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from database import Base, Poll, User
+from database import Base, Poll, User, migrations
 
 
 class Answer(Base):
@@ -16,7 +18,34 @@ class Answer(Base):
     )
     answer: Mapped[dict] = mapped_column(JSON)
 
-    poll: Mapped[Poll] = relationship(Poll, lazy="joined")
-    answerer: Mapped[User | None] = relationship(User, lazy="joined")
+    poll: Mapped[Poll] = relationship(Poll, lazy="raise")
+    answerer: Mapped[User | None] = relationship(User, lazy="raise")
 
     __table_args__ = (UniqueConstraint(poll_id, answerer_id),)
+
+
+class AnswerValue(Base):
+    __tablename__ = "answer_values"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    answer_id: Mapped[int] = mapped_column(ForeignKey(Answer.id, ondelete="CASCADE"))
+    poll_id: Mapped[int] = mapped_column(ForeignKey(Poll.id, ondelete="CASCADE"))
+    question_id: Mapped[UUID] = mapped_column()
+    question_type: Mapped[int]
+    value: Mapped[dict] = mapped_column(JSON)
+
+    __table_args__ = (
+        UniqueConstraint(answer_id, question_id),
+        Index("answer_values_poll_question", poll_id, question_id),
+    )
+
+
+migrations["answer_values_backfill"] = (
+    "INSERT INTO answer_values (answer_id, poll_id, question_id, question_type, value) "
+    "SELECT answers.id, answers.poll_id, "
+    "(v ->> 'question_id')::uuid, (v ->> 'question_type')::integer, "
+    "(v::jsonb - 'question_id' - 'question_type')::json "
+    "FROM answers CROSS JOIN LATERAL json_array_elements(answers.answer -> 'values') v "
+    "WHERE NOT EXISTS "
+    "(SELECT 1 FROM answer_values WHERE answer_values.answer_id = answers.id) "
+    "ON CONFLICT (answer_id, question_id) DO NOTHING"
+)
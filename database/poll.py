@@ -1,7 +1,7 @@
 from sqlalchemy import JSON, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from database import Base, User
+from database import Base, User, extensions, migrations
 
 
 class Poll(Base):
@@ -10,5 +10,16 @@ class Poll(Base):
     owner_id: Mapped[int] = mapped_column(ForeignKey(User.id, ondelete="CASCADE"))
     name: Mapped[str]
     poll: Mapped[dict] = mapped_column(JSON)
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
 
-    owner: Mapped[User] = relationship(User, lazy="joined")
+    owner: Mapped[User] = relationship(User, lazy="raise")
+
+
+extensions.append("pg_trgm")
+migrations[
+    "polls_version"
+] = "ALTER TABLE polls ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1"
+migrations["polls_name_trgm"] = (
+    "CREATE INDEX IF NOT EXISTS polls_name_trgm "
+    "ON polls USING gin (lower(name) gin_trgm_ops)"
+)
@@ -0,0 +1,16 @@
+from uuid import UUID
+
+from sqlalchemy import JSON, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base, Poll
+
+
+class Result(Base):
+    __tablename__ = "results"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    poll_id: Mapped[int] = mapped_column(ForeignKey(Poll.id, ondelete="CASCADE"))
+    question_id: Mapped[UUID] = mapped_column()
+    result: Mapped[dict] = mapped_column(JSON)
+
+    __table_args__ = (UniqueConstraint(poll_id, question_id),)
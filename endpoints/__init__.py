@@ -5,8 +5,10 @@ from . import dependencies
 from . import account
 from . import poll
 from . import answers
+from . import metrics
 
 router = APIRouter()
 router.include_router(account.router)
 router.include_router(poll.router)
 router.include_router(answers.router)
+router.include_router(metrics.router)
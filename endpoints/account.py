@@ -1,26 +1,21 @@
-import hashlib
 import os
 import secrets
 from typing import Annotated
 
 import jwt
-from aiofiles import open
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
-from sqlalchemy import select
+from fastapi import APIRouter, File, Header, HTTPException, Path, UploadFile
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import and_, select, update
 
 import database
 from endpoints import dependencies
 from models import account as models
 from settings import settings
+from utils import avatars, passwords
 
 router = APIRouter(prefix="/account", tags=["Account"])
 
 
-def hash_password(password: str, salt: str) -> str:
-    return hashlib.sha512((password + salt).encode("UTF-8")).hexdigest()
-
-
 def token_model(user: database.User) -> models.Token:
     return models.Token(
         id=user.id,
@@ -33,9 +28,10 @@ def token_model(user: database.User) -> models.Token:
     )
 
 
-@router.post("/register")
+@router.post("/register", dependencies=[dependencies.ClientLimit])
 async def register(auth: models.Auth) -> models.Token:
     salt = secrets.token_hex(8)
+    password = await passwords.hash(auth.password, salt)
     async with database.sessions.begin() as session:
         if (
             await session.scalar(
@@ -47,7 +43,7 @@ async def register(auth: models.Auth) -> models.Token:
 
         user = database.User(
             username=auth.username,
-            password=hash_password(auth.password, salt),
+            password=password,
             salt=salt,
         )
         session.add(user)
@@ -56,18 +52,50 @@ async def register(auth: models.Auth) -> models.Token:
         return token_model(user)
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[dependencies.ClientLimit])
 async def login(auth: models.Auth) -> models.Token:
     async with database.sessions.begin() as session:
-        user = await session.scalar(
+        found = await session.scalar(
             select(database.User).where(database.User.username == auth.username)
         )
+        user = dependencies.detached(found) if found is not None else None
 
-        if user is None or user.password != hash_password(auth.password, user.salt):
-            raise HTTPException(403, "Username or password is invalid")
+    verified = (
+        await passwords.verify(auth.password, user.salt, user.password)
+        if user is not None
+        else await passwords.dummy(auth.password)
+    )
+    if user is None or not verified:
+        raise HTTPException(403, "Username or password is invalid")
 
+    if not passwords.outdated(user.password):
         return token_model(user)
 
+    salt = secrets.token_hex(8)
+    password = await passwords.hash(auth.password, salt)
+    async with database.sessions.begin() as session:
+        upgraded = await session.scalar(
+            update(database.User)
+            .where(
+                and_(
+                    database.User.id == user.id,
+                    database.User.password == user.password,
+                )
+            )
+            .values(salt=salt, password=password)
+            .returning(database.User.id)
+        )
+
+    if upgraded is None:
+        raise HTTPException(403, "Username or password is invalid")
+
+    user.salt = salt
+    user.password = password
+    passwords.upgrades.inc()
+
+    await dependencies.invalidate_user(user.id)
+    return token_model(user)
+
 
 @router.get("/me")
 async def me(user: dependencies.User) -> models.User:
@@ -98,15 +126,59 @@ async def get_by_username(username: str) -> models.User | None:
         return models.User.from_orm(user)
 
 
-@router.get("/get/image")
-async def get_image(user_id: int) -> FileResponse:
-    path = f"./files/{user_id}-avatar.png"
-    if not os.path.exists(path):
-        return FileResponse("./static/no-avatar.png", filename="avatar.png")
-    return FileResponse(path, filename="avatar.png")
+async def avatar_response(
+    digest: str,
+    size: int | None,
+    if_none_match: str | None,
+    cache_control: str,
+) -> Response:
+    variant = avatars.variant(size)
+    etag = f'"{digest}-{variant if variant is not None else "original"}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data = await avatars.read(digest, variant)
+    except FileNotFoundError:
+        raise HTTPException(404, "Image not found")
+
+    return Response(data, media_type="image/png", headers=headers)
+
+
+@router.get("/get/image", response_class=Response)
+async def get_image(
+    user_id: int,
+    size: int | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    user = dependencies.users.get(user_id) or await dependencies.load_user(user_id)
+
+    if user is None or user.avatar is None:
+        path = f"./files/{user_id}-avatar.png"
+        if not os.path.exists(path):
+            return FileResponse("./static/no-avatar.png", filename="avatar.png")
+        return FileResponse(path, filename="avatar.png")
+
+    return await avatar_response(user.avatar, size, if_none_match, "no-cache")
+
+
+@router.get("/get/image/{digest}", response_class=Response)
+async def get_image_by_digest(
+    digest: Annotated[str, Path(regex="^[0-9a-f]{64}$")],
+    size: int | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    return await avatar_response(
+        digest,
+        size,
+        if_none_match,
+        f"public, max-age={settings.avatar_max_age}, immutable",
+    )
 
 
-@router.put("/update/username")
+@router.put("/update/username", dependencies=[dependencies.ClientLimit])
 async def update_username(
     user: dependencies.User,
     update: models.UpdateUsername,
@@ -125,38 +197,53 @@ async def update_username(
             raise HTTPException(400, "User with this username already exists")
 
         user.username = update.username.strip()
-        return models.User.from_orm(user)
+        updated = models.User.from_orm(user)
+
+    await dependencies.invalidate_user(updated.id)
+    return updated
 
 
-@router.put("/update/password")
+@router.put("/update/password", dependencies=[dependencies.ClientLimit])
 async def update_password(
     user: dependencies.User,
     update: models.UpdatePassword,
 ) -> models.Token:
+    salt = secrets.token_hex(8)
+    password = await passwords.hash(update.password.strip(), salt)
     async with database.sessions.begin() as session:
         session.add(user)
 
-        user.salt = secrets.token_hex(8)
-        user.password = hash_password(update.password.strip(), user.salt)
-        return token_model(user)
+        user.salt = salt
+        user.password = password
+        token = token_model(user)
+
+    await dependencies.invalidate_user(token.id)
+    return token
 
 
-@router.put("/update/image")
+@router.put("/update/image", dependencies=[dependencies.ClientLimit])
 async def update_image(
     user: dependencies.User,
     file: Annotated[UploadFile, File()],
 ) -> None:
-    if file.size is None or file.size > 524288:
-        raise HTTPException(400, "The file is to large. Max size 512KiB")
     if file.filename is None or not file.filename.endswith(".png"):
         raise HTTPException(400, "Unsupported file type. Only png files are allowed.")
 
-    async with open(f"./files/{user.id}-avatar.png", "wb") as sys_file:
-        await sys_file.write(await file.read())
+    digest = await avatars.store(file)
+    async with database.sessions.begin() as session:
+        session.add(user)
+
+        user.avatar = digest
+        user_id = user.id
 
+    await dependencies.invalidate_user(user_id)
 
-@router.delete("/delete")
+
+@router.delete("/delete", dependencies=[dependencies.ClientLimit])
 async def delete(user: dependencies.User) -> models.User:
     async with database.sessions.begin() as session:
         await session.delete(user)
-        return models.User.from_orm(user)
+        deleted = models.User.from_orm(user)
+
+    await dependencies.invalidate_user(deleted.id)
+    return deleted
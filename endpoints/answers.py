@@ -1,145 +1,444 @@
-from asyncio import Queue
+import asyncio
+from functools import partial
+from typing import Annotated, Any, AsyncIterator, Coroutine
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, WebSocket
+from fastapi import APIRouter, Body, HTTPException, Query, Request, WebSocket
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
-from sqlalchemy import and_, delete, or_, select
+from pydantic.error_wrappers import ErrorWrapper
+from sqlalchemy import JSON, and_, cast, delete, func, insert, not_, or_, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from websockets.exceptions import ConnectionClosed
 
 import database
 import models as m
 from endpoints import dependencies
 from models import answers as models
+from settings import settings
+from utils import (
+    answers,
+    broadcast,
+    buffer,
+    exports,
+    metrics,
+    polls,
+    questions,
+    queues,
+    results,
+    streams,
+    values,
+)
 
 router = APIRouter(prefix="/answers", tags=["Answers"])
-values_pull: dict[int, set[Queue[models.Value]]] = {}
-questions_pull: dict[int, set[Queue[m.poll.Question]]] = {}
+values_pull: dict[int, set[queues.BoundedQueue[str]]] = {}
+questions_pull = questions.pull
+ticks_pull: dict[int, set[queues.BoundedQueue[str]]] = {}
+tickers: dict[int, asyncio.Task[None]] = {}
+releases: set[asyncio.Task[None]] = set()
 
 
-def put_values(poll_id: int, values: list[models.Value]) -> None:
-    if poll_id not in values_pull:
-        return
-    for queue in (q for q in values_pull[poll_id]):
-        for value in values:
-            queue.put_nowait(value)
+def depth(pull: dict[int, set[queues.BoundedQueue[Any]]]) -> int:
+    return sum(q.qsize() for queue_set in pull.values() for q in queue_set)
+
+
+subscribers = metrics.Gauge("pollify_listen_subscribers", "Open listener sockets")
+queue_depth = metrics.Gauge("pollify_listen_queue_depth", "Messages waiting in queues")
+listened = metrics.Gauge("pollify_listen_polls", "Polls with open listener sockets")
+listened.track(lambda: len(values_pull), channel="values")
+listened.track(lambda: len(questions_pull), channel="questions")
+listened.track(lambda: len(ticks_pull), channel="ticks")
+subscribers.track(lambda: sum(map(len, values_pull.values())), channel="values")
+subscribers.track(lambda: sum(map(len, questions_pull.values())), channel="questions")
+subscribers.track(lambda: sum(map(len, ticks_pull.values())), channel="ticks")
+queue_depth.track(lambda: depth(values_pull), channel="values")
+queue_depth.track(lambda: depth(questions_pull), channel="questions")
+queue_depth.track(lambda: depth(ticks_pull), channel="ticks")
 
 
-def put_questions(poll_id: int, question: m.poll.Question) -> None:
-    if poll_id not in questions_pull:
+def dispatch_values(poll_id: int, message: str) -> None:
+    if poll_id not in streams.streams:
         return
-    for queue in (q for q in questions_pull[poll_id]):
-        queue.put_nowait(question)
+    stream = streams.streams[poll_id]
+    for frame in message.split("\n"):
+        if frame == streams.resync:
+            stream.reset()
+        else:
+            pushed = stream.push(frame)
+            if pushed is None:
+                continue
+            frame = pushed
+        for queue in (q for q in values_pull.get(poll_id, ())):
+            queue.put_nowait(frame)
+
+
+async def tick(poll_id: int) -> None:
+    seq: int | None = None
+    while poll_id in ticks_pull:
+        await asyncio.sleep(settings.listen_tick_interval)
+        stream = streams.streams.get(poll_id)
+        if stream is None or stream.results is None or stream.seq == seq:
+            continue
+
+        seq = stream.seq
+        message = stream.snapshot()
+        for queue in (q for q in ticks_pull.get(poll_id, ())):
+            queue.put_nowait(message)
+    tickers.pop(poll_id, None)
+
+
+async def release(poll_id: int) -> None:
+    await asyncio.sleep(settings.listen_resume_ttl)
+    if (
+        poll_id not in values_pull
+        and poll_id not in ticks_pull
+        and poll_id in streams.streams
+    ):
+        streams.streams.pop(poll_id)
+        await broadcast.backend.unsubscribe(f"values_{poll_id}")
+
+
+async def put_questions(poll_id: int, question: m.poll.Question) -> None:
+    await questions.publish(poll_id, question.json(), question.question_id)
+
+
+async def upsert_value(
+    session: AsyncSession,
+    poll_id: int,
+    answerer_id: int | None,
+    value: models.Value,
+) -> tuple[int, dict] | None:
+    document = {"values": [value.serializable()]}
+
+    if answerer_id is None:
+        row = (
+            await session.execute(
+                insert(database.Answer)
+                .values(poll_id=poll_id, answerer_id=None, answer=document)
+                .returning(database.Answer.id, database.Answer.answer)
+            )
+        ).one()
+        return row.id, row.answer
+
+    if database.engine.dialect.name == "postgresql":
+        statement = postgresql.insert(database.Answer).values(  # type: ignore[no-untyped-call]
+            poll_id=poll_id,
+            answerer_id=answerer_id,
+            answer=document,
+        )
+        stored = cast(database.Answer.answer, JSONB)["values"]
+        statement = statement.on_conflict_do_update(
+            index_elements=[database.Answer.poll_id, database.Answer.answerer_id],
+            set_={
+                "answer": cast(
+                    func.jsonb_build_object(
+                        "values",
+                        stored.op("||")(
+                            cast(statement.excluded.answer, JSONB)["values"]
+                        ),
+                    ),
+                    JSON,
+                )
+            },
+            where=not_(stored.contains([{"question_id": str(value.question_id)}])),
+        ).returning(database.Answer.id, database.Answer.answer)
+
+        upserted = (await session.execute(statement)).one_or_none()
+        return (upserted.id, upserted.answer) if upserted is not None else None
+
+    answer = await session.scalar(
+        select(database.Answer)
+        .where(
+            and_(
+                database.Answer.poll_id == poll_id,
+                database.Answer.answerer_id == answerer_id,
+            )
+        )
+        .with_for_update()
+    )
+
+    if answer is None:
+        answer = database.Answer(
+            poll_id=poll_id,
+            answerer_id=answerer_id,
+            answer=document,
+        )
+        session.add(answer)
+    elif any(
+        v["question_id"] == str(value.question_id) for v in answer.answer["values"]
+    ):
+        return None
+    else:
+        answer.answer = {"values": answer.answer["values"] + document["values"]}
 
+    await session.flush()
+    return answer.id, answer.answer
 
-@router.post("/add/value")
+
+@router.post(
+    "/add/value", dependencies=[dependencies.ClientLimit, dependencies.PollLimit]
+)
 async def add_value(
     user: dependencies.OptionalUser,
     poll_id: int,
     value: models.Value,
 ) -> models.Answer:
     async with database.sessions.begin() as session:
-        if (
-            user is not None
-            and (
-                answer := await session.scalar(
-                    select(database.Answer).where(
-                        and_(
-                            database.Answer.poll_id == poll_id,
-                            database.Answer.answerer_id == user.id,
-                        )
-                    )
-                )
-            )
-            is not None
-        ):
-            answer_schema = models.AnswerSchema.parse_obj(answer.answer)
-        else:
-            answer_schema = models.AnswerSchema(values=[])
-            answer = database.Answer(
-                poll_id=poll_id,
-                answerer_id=user.id if user is not None else None,
-                answer=answer_schema.serializable(),
-            )
-            session.add(answer)
+        poll_model = await polls.get(session, poll_id)
 
-        answer_schema.values.append(value)
+        if poll_model is None:
+            raise HTTPException(400, "Poll not found")
 
         try:
-            models.AnswerSchema.validate(answer_schema)
-        except ValidationError as e:
-            raise RequestValidationError(e.raw_errors)
+            models.check(poll_model.poll, [value])
+        except AssertionError as e:
+            raise RequestValidationError([ErrorWrapper(e, ("body",))])
+
+        row = await upsert_value(
+            session,
+            poll_id,
+            user.id if user is not None else None,
+            value,
+        )
 
-        answer.answer = answer_schema.serializable()
-        await session.flush()
-        await session.refresh(answer)
+        if row is None:
+            raise RequestValidationError(
+                [
+                    ErrorWrapper(
+                        AssertionError(
+                            "All values must be linked to different questions"
+                        ),
+                        ("body",),
+                    )
+                ]
+            )
 
         try:
-            answer_model = models.Answer.from_orm(answer)
+            answer_model = models.Answer(
+                id=row[0],
+                poll=poll_model,
+                answerer=m.account.User.from_orm(user) if user is not None else None,
+                answer=row[1],
+            )
         except ValidationError as e:
             raise RequestValidationError(e.raw_errors)
 
-        put_values(poll_id, answer_model.answer.values)
-        return answer_model
+        await values.add(session, row[0], poll_id, [value])
+        totals = await results.apply(session, poll_model, [value])
+
+    await streams.publish(poll_id, [value], totals)
+    return answer_model
 
 
-@router.post("/add/answer")
+@router.post(
+    "/add/answer", dependencies=[dependencies.ClientLimit, dependencies.PollLimit]
+)
 async def add_answer(
     user: dependencies.OptionalUser,
     poll_id: int,
     answer_schema: models.AnswerSchema,
 ) -> models.Answer:
     async with database.sessions.begin() as session:
-        answer = database.Answer(
-            poll_id=poll_id,
-            answerer_id=user.id if user is not None else None,
-            answer=answer_schema.serializable(),
-        )
+        poll_model = await polls.get(session, poll_id)
 
-        session.add(answer)
-        await session.flush()
-        await session.refresh(answer)
+        if poll_model is None:
+            raise HTTPException(400, "Poll not found")
 
         try:
-            answer_model = models.Answer.from_orm(answer)
-        except ValidationError as e:
-            raise RequestValidationError(e.raw_errors)
+            models.check(poll_model.poll, answer_schema.values)
+        except AssertionError as e:
+            raise RequestValidationError([ErrorWrapper(e, ("body",))])
+
+        if user is not None or not buffer.buffer.enabled:
+            answer_id = (
+                await session.execute(
+                    insert(database.Answer)
+                    .values(
+                        poll_id=poll_id,
+                        answerer_id=user.id if user is not None else None,
+                        answer=answer_schema.serializable(),
+                    )
+                    .returning(database.Answer.id)
+                )
+            ).scalar_one()
+
+            answer_model = models.Answer.construct(
+                id=answer_id,
+                poll=poll_model,
+                answerer=m.account.User.from_orm(user) if user is not None else None,
+                answer=answer_schema,
+            )
+
+            await values.add(session, answer_id, poll_id, answer_model.answer.values)
+            totals = await results.apply(
+                session, poll_model, answer_model.answer.values
+            )
+
+    if user is None and buffer.buffer.enabled:
+        answer_id = await buffer.buffer.put(poll_model, answer_schema)
+        return models.Answer.construct(
+            id=answer_id,
+            poll=poll_model,
+            answerer=None,
+            answer=answer_schema,
+        )
+
+    await streams.publish(poll_id, answer_model.answer.values, totals)
+    return answer_model
+
+
+def check_item(
+    poll_model: m.poll.Poll,
+    index: int,
+    item: Any,
+) -> models.AnswerSchema | models.BulkError:
+    try:
+        answer_schema = (
+            models.AnswerSchema.parse_raw(item)
+            if isinstance(item, bytes)
+            else models.AnswerSchema.parse_obj(item)
+        )
+        models.check(poll_model.poll, answer_schema.values)
+        return answer_schema
+    except ValidationError as e:
+        return models.BulkError(index=index, errors=e.errors())
+    except AssertionError as e:
+        return models.BulkError(
+            index=index,
+            errors=[{"loc": ["body", index], "msg": str(e), "type": "assertion_error"}],
+        )
+
+
+def check_items(
+    poll_model: m.poll.Poll,
+    items: list[Any],
+    result: models.BulkResult,
+) -> list[tuple[int, models.AnswerSchema]]:
+    accepted: list[tuple[int, models.AnswerSchema]] = []
+    for item in items:
+        if len(result.ids) >= settings.bulk_size:
+            raise HTTPException(413, "Too many answers")
+
+        checked = check_item(poll_model, len(result.ids), item)
+        if isinstance(checked, models.BulkError):
+            result.errors.append(checked)
+        else:
+            accepted.append((len(result.ids), checked))
+        result.ids.append(None)
+
+    return accepted
+
+
+async def add_items(
+    session: AsyncSession,
+    poll_model: m.poll.Poll,
+    accepted: list[tuple[int, models.AnswerSchema]],
+    result: models.BulkResult,
+) -> tuple[list[models.Value], dict[UUID, int]]:
+    added: list[models.Value] = []
+    totals: dict[UUID, int] = {}
+
+    for start in range(0, len(accepted), settings.bulk_chunk_size):
+        chunk = accepted[start : start + settings.bulk_chunk_size]
+        ids, chunk_totals = await answers.add(
+            session, poll_model, [schema for _, schema in chunk]
+        )
+        for (index, schema), answer_id in zip(chunk, ids):
+            result.ids[index] = answer_id
+            added.extend(schema.values)
+        totals.update(chunk_totals)
+
+    return added, totals
 
-        put_values(poll_id, answer_model.answer.values)
-        return answer_model
 
+@router.post(
+    "/add/bulk", dependencies=[dependencies.ClientLimit, dependencies.PollLimit]
+)
+async def add_bulk(
+    poll_id: int,
+    items: Annotated[list[Any], Body()],
+) -> models.BulkResult:
+    if len(items) > settings.bulk_size:
+        raise HTTPException(413, "Too many answers")
+
+    async with database.sessions.begin() as session:
+        poll_model = await polls.get(session, poll_id)
+
+        if poll_model is None:
+            raise HTTPException(400, "Poll not found")
+
+        result = models.BulkResult()
+        added, totals = await add_items(
+            session, poll_model, check_items(poll_model, items, result), result
+        )
 
-@router.post("/send/question")
+    await streams.publish(poll_id, added, totals)
+    return result
+
+
+async def lines(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in request.stream():
+        *complete, buffer = (buffer + chunk).split(b"\n")
+        for line in complete:
+            yield line
+    yield buffer
+
+
+@router.post(
+    "/add/bulk/ndjson", dependencies=[dependencies.ClientLimit, dependencies.PollLimit]
+)
+async def add_bulk_ndjson(request: Request, poll_id: int) -> models.BulkResult:
+    async with database.sessions.begin() as session:
+        poll_model = await polls.get(session, poll_id)
+
+    if poll_model is None:
+        raise HTTPException(400, "Poll not found")
+
+    result = models.BulkResult()
+    accepted: list[tuple[int, models.AnswerSchema]] = []
+
+    async for line in lines(request):
+        if line.strip() != b"":
+            accepted.extend(check_items(poll_model, [line], result))
+
+    async with database.sessions.begin() as session:
+        added, totals = await add_items(session, poll_model, accepted, result)
+
+    await streams.publish(poll_id, added, totals)
+    return result
+
+
+@router.post("/send/question", dependencies=[dependencies.ClientLimit])
 async def send_questions(
     user: dependencies.User,
     poll_id: int,
     question_id: UUID,
 ) -> None:
     async with database.sessions.begin() as session:
-        poll = await session.scalar(
-            select(database.Poll).where(
-                and_(
-                    database.Poll.id == poll_id,
-                    database.Poll.owner_id == user.id,
-                )
-            )
-        )
+        poll_model = await polls.owned(session, poll_id, user.id)
 
-        if poll is None:
+        if poll_model is None:
             raise HTTPException(400, "Poll not found")
 
-        uuids = m.poll.Poll.from_orm(poll).poll.uuids
+        uuids = poll_model.poll.uuids
         if question_id not in uuids:
             raise HTTPException(400, "Question not found")
 
-        put_questions(poll_id, uuids[question_id])
+        await put_questions(poll_id, uuids[question_id])
 
 
 @router.get("/get/id")
 async def get_by_id(user: dependencies.OptionalUser, id: int) -> models.Answer | None:
     async with database.sessions.begin() as session:
         answer = await session.scalar(
-            select(database.Answer).where(
+            select(database.Answer)
+            .options(joinedload(database.Answer.answerer))
+            .where(
                 and_(
                     database.Answer.id == id,
                     (
@@ -157,14 +456,17 @@ async def get_by_id(user: dependencies.OptionalUser, id: int) -> models.Answer |
         if answer is None:
             return None
 
-        return models.Answer.from_orm(answer)
+        poll_model = await polls.get(session, answer.poll_id)
+        return polls.answer(answer, poll_model) if poll_model is not None else None
 
 
 @router.get("/get/my")
 async def get_by_poll_id(user: dependencies.User, poll_id: int) -> models.Answer | None:
     async with database.sessions.begin() as session:
         answer = await session.scalar(
-            select(database.Answer).where(
+            select(database.Answer)
+            .options(joinedload(database.Answer.answerer))
+            .where(
                 and_(
                     database.Answer.poll_id == poll_id,
                     or_(
@@ -178,7 +480,8 @@ async def get_by_poll_id(user: dependencies.User, poll_id: int) -> models.Answer
         if answer is None:
             return None
 
-        return models.Answer.from_orm(answer)
+        poll_model = await polls.get(session, answer.poll_id)
+        return polls.answer(answer, poll_model) if poll_model is not None else None
 
 
 @router.get("/get/values")
@@ -186,73 +489,212 @@ async def get_values(
     user: dependencies.User,
     poll_id: int,
 ) -> list[models.Value]:
-    async with database.sessions.begin() as session:
-        values = []
-        for answer in map(
-            models.Answer.from_orm,
-            await session.scalars(
-                select(database.Answer)
+    async with database.replica_sessions.begin() as session:
+        return [
+            values.parse(value)
+            for value in await session.scalars(
+                select(database.AnswerValue)
+                .join(database.Poll, database.AnswerValue.poll_id == database.Poll.id)
                 .where(
                     and_(
                         database.Poll.owner_id == user.id,
-                        database.Answer.poll_id == poll_id,
+                        database.AnswerValue.poll_id == poll_id,
                     )
                 )
-                .join(database.Answer.poll)
-            ),
-        ):
-            values.extend(answer.answer.values)
-        return values
+                .order_by(database.AnswerValue.id)
+            )
+        ]
+
+
+@router.get("/get/question")
+async def get_question_values(
+    user: dependencies.User,
+    poll_id: int,
+    question_id: UUID,
+) -> list[models.Value]:
+    async with database.replica_sessions.begin() as session:
+        return [
+            values.parse(value)
+            for value in await session.scalars(
+                select(database.AnswerValue)
+                .join(database.Poll, database.AnswerValue.poll_id == database.Poll.id)
+                .where(
+                    and_(
+                        database.Poll.owner_id == user.id,
+                        database.AnswerValue.poll_id == poll_id,
+                        database.AnswerValue.question_id == question_id,
+                    )
+                )
+                .order_by(database.AnswerValue.id)
+            )
+        ]
+
+
+@router.get("/get/results")
+async def get_results(
+    user: dependencies.User,
+    poll_id: int,
+) -> list[m.results.Result]:
+    async with database.sessions.begin() as session:
+        poll_model = await polls.owned(session, poll_id, user.id)
 
+        if poll_model is None:
+            raise HTTPException(400, "Poll not found")
+
+        return await results.get(session, poll_model)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    user: dependencies.User,
+    poll_id: int,
+    export_format: models.ExportFormat = Query(models.ExportFormat.csv, alias="format"),
+) -> StreamingResponse:
+    async with database.sessions.begin() as session:
+        poll_model = await polls.owned(session, poll_id, user.id)
+
+        if poll_model is None:
+            raise HTTPException(400, "Poll not found")
 
-@router.delete("/delete")
+        columns = list(poll_model.poll.uuids)
+
+    if export_format == models.ExportFormat.csv:
+        return StreamingResponse(
+            exports.csv_stream(poll_id, columns),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{poll_id}.csv"'},
+        )
+
+    return StreamingResponse(
+        exports.ndjson_stream(poll_id, columns),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{poll_id}.ndjson"'},
+    )
+
+
+@router.delete("/delete", dependencies=[dependencies.ClientLimit])
 async def delete_answers(user: dependencies.User, poll_id: int) -> None:
     async with database.sessions.begin() as session:
+        poll_model = await polls.owned(session, poll_id, user.id)
+
+        if poll_model is None:
+            return
+
         await session.execute(
-            delete(database.Answer).where(
-                and_(
-                    database.Answer.poll_id == poll_id,
-                    database.Answer.poll.has(database.Poll.owner_id == user.id),
-                )
-            )
+            delete(database.Answer).where(database.Answer.poll_id == poll_id)
+        )
+        await results.reset(session, poll_id, poll_model.poll)
+
+    await streams.reset(poll_id)
+
+
+async def disconnected(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+async def relay(websocket: WebSocket, sending: Coroutine[Any, Any, None]) -> None:
+    sender = asyncio.create_task(sending)
+    receiver = asyncio.create_task(disconnected(websocket))
+    try:
+        done, _ = await asyncio.wait(
+            (sender, receiver), return_when=asyncio.FIRST_COMPLETED
         )
+    finally:
+        sender.cancel()
+        receiver.cancel()
+    for task in done:
+        task.result()
 
 
 @router.websocket("/listen/values")
-async def listen_values(websocket: WebSocket, poll_id: int) -> None:
+async def listen_values(
+    websocket: WebSocket,
+    poll_id: int,
+    batch: bool = False,
+    since: int | None = None,
+    ticks: bool = False,
+) -> None:
     await websocket.accept()
-    if poll_id not in values_pull:
-        values_pull[poll_id] = set()
-
-    queue: Queue[models.Value] = Queue()
-    values_pull[poll_id].add(queue)
+    if poll_id not in streams.streams:
+        streams.streams[poll_id] = streams.Stream(poll_id)
+        await broadcast.backend.subscribe(
+            f"values_{poll_id}",
+            partial(dispatch_values, poll_id),
+        )
 
+    stream = streams.streams[poll_id]
+    loading = stream.loading
     try:
-        while True:
+        await loading
+    except Exception:
+        if streams.streams.get(poll_id) is stream and stream.loading is loading:
+            if poll_id in values_pull or poll_id in ticks_pull:
+                dispatch_values(poll_id, streams.resync)
+            else:
+                streams.streams.pop(poll_id)
+                await broadcast.backend.unsubscribe(f"values_{poll_id}")
+        raise
+
+    backlog = stream.since(since) if since is not None and not ticks else None
+    pull = ticks_pull if ticks else values_pull
+    queue: queues.BoundedQueue[str] = (
+        queues.BoundedQueue(streams.resync, 1, "drop_oldest")
+        if ticks
+        else queues.BoundedQueue(streams.resync)
+    )
+    pull.setdefault(poll_id, set()).add(queue)
+
+    if ticks and poll_id not in tickers:
+        tickers[poll_id] = asyncio.create_task(tick(poll_id))
+
+    async def send() -> None:
+        for message in backlog if backlog is not None else [stream.snapshot()]:
+            await websocket.send_text(message)
+        while not queue.evicted:
             message = await queue.get()
-            await websocket.send_text(message.json())
+            if batch:
+                await asyncio.sleep(settings.listen_batch_window)
+                frames = [message]
+                while not queue.empty():
+                    frames.append(queue.get_nowait())
+                message = "[" + ",".join(frames) + "]"
+            await websocket.send_text(message)
+        await websocket.close(1013)
+
+    try:
+        await relay(websocket, send())
     except ConnectionClosed:
-        values_pull[poll_id].remove(queue)
-        if len(values_pull[poll_id]) == 0:
-            values_pull.pop(poll_id)
         await websocket.close()
+    finally:
+        pull[poll_id].remove(queue)
+        if len(pull[poll_id]) == 0:
+            pull.pop(poll_id)
+        if poll_id not in values_pull and poll_id not in ticks_pull:
+            task = asyncio.create_task(release(poll_id))
+            releases.add(task)
+            task.add_done_callback(releases.discard)
 
 
 @router.websocket("/listen/questions")
 async def listen_questions(websocket: WebSocket, poll_id: int) -> None:
     await websocket.accept()
-    if poll_id not in questions_pull:
-        questions_pull[poll_id] = set()
+    queue: queues.BoundedQueue[str] = queues.BoundedQueue(streams.resync)
+    questions_pull.setdefault(poll_id, set()).add(queue)
+    presented = questions.current.get(poll_id)
 
-    queue: Queue[m.poll.Question] = Queue()
-    questions_pull[poll_id].add(queue)
+    async def send() -> None:
+        if presented is not None:
+            await websocket.send_text(presented)
+        while not queue.evicted:
+            await websocket.send_text(await queue.get())
+        await websocket.close(1013)
 
     try:
-        while True:
-            message = await queue.get()
-            await websocket.send_text(message.json())
+        await relay(websocket, send())
     except ConnectionClosed:
+        await websocket.close()
+    finally:
         questions_pull[poll_id].remove(queue)
         if len(questions_pull[poll_id]) == 0:
             questions_pull.pop(poll_id)
-        await websocket.close()
@@ -1,14 +1,77 @@
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, Header, HTTPException
+from fastapi import Depends, Header, HTTPException, Request
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 
 import database
 from settings import settings
+from utils import broadcast, cache, limits
 
+users: cache.Cache[int, database.User] = cache.Cache(
+    "users",
+    settings.user_cache_size,
+    settings.user_cache_ttl,
+)
+evictions = 0
 
-async def user(token: Annotated[str, Header(alias="x-token")]) -> database.User:
+client_buckets = limits.Limiter(
+    "clients",
+    settings.rate_limit_client_rate,
+    settings.rate_limit_client_burst,
+    settings.rate_limit_size,
+)
+poll_buckets = limits.Limiter(
+    "polls",
+    settings.rate_limit_poll_rate,
+    settings.rate_limit_poll_burst,
+    settings.rate_limit_size,
+)
+
+
+def evict_user(id: int) -> None:
+    global evictions
+    evictions += 1
+    users.pop(id)
+
+
+async def invalidate_user(id: int) -> None:
+    evict_user(id)
+    await broadcast.backend.publish("users", str(id))
+
+
+broadcast.channels["users"] = lambda message: evict_user(int(message))
+broadcast.resyncs.append(users.clear)
+
+
+def detached(user: database.User) -> database.User:
+    copy = database.User(
+        id=user.id,
+        username=user.username,
+        password=user.password,
+        salt=user.salt,
+        avatar=user.avatar,
+    )
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def load_user(id: int) -> database.User | None:
+    generation = evictions
+    async with database.sessions.begin() as session:
+        user = await session.scalar(select(database.User).where(database.User.id == id))
+
+        if user is None:
+            return None
+
+        cached = detached(user)
+        if generation == evictions:
+            users.set(id, cached)
+        return cached
+
+
+async def authenticate(token: str) -> database.User:
     try:
         data = jwt.decode(token, options={"verify_signature": False})
     except jwt.exceptions.DecodeError:
@@ -17,28 +80,58 @@ async def user(token: Annotated[str, Header(alias="x-token")]) -> database.User:
     if "sub" not in data and not isinstance(data["sub"], int):
         raise HTTPException(401, "Token is invalid")
 
-    async with database.sessions.begin() as session:
-        user = await session.scalar(
-            select(database.User).where(database.User.id == data["sub"])
-        )
+    cached = users.get(data["sub"])
+    found = cached if cached is not None else await load_user(data["sub"])
 
-        if user is None:
-            raise HTTPException(401, "Token is invalid")
+    if found is None:
+        raise HTTPException(401, "Token is invalid")
 
-        try:
-            jwt.decode(token, settings.secret + user.password, algorithms=["HS256"])
-        except jwt.exceptions.InvalidSignatureError:
+    try:
+        jwt.decode(token, settings.secret + found.password, algorithms=["HS256"])
+    except jwt.exceptions.InvalidSignatureError:
+        if cached is None:
             raise HTTPException(401, "Token is invalid")
 
-        session.expunge(user)
-        return user
+        users.pop(data["sub"])
+        return await authenticate(token)
+
+    return found
+
+
+async def user(
+    request: Request,
+    token: Annotated[str, Header(alias="x-token")],
+) -> database.User:
+    if getattr(request.state, "user", None) is None:
+        request.state.user = await authenticate(token)
+    return detached(request.state.user)
 
 
 async def optional_user(
+    request: Request,
     token: str | None = Header(None, alias="x-token"),
 ) -> database.User | None:
-    return await user(token) if token is not None else token
+    return await user(request, token) if token is not None else token
 
 
 User = Annotated[database.User, Depends(user, use_cache=False)]
 OptionalUser = Annotated[database.User | None, Depends(optional_user, use_cache=False)]
+
+
+async def client_limit(request: Request, user: OptionalUser) -> None:
+    if not settings.rate_limit:
+        return
+
+    if user is not None:
+        client_buckets.check(("user", user.id))
+    else:
+        client_buckets.check(("ip", request.client.host if request.client else None))
+
+
+async def poll_limit(poll_id: int) -> None:
+    if settings.rate_limit:
+        poll_buckets.check(poll_id)
+
+
+ClientLimit = Depends(client_limit)
+PollLimit = Depends(poll_limit)
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import and_, delete, select, func
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from sqlalchemy import ColumnElement, Float, and_, delete, func, select
+from sqlalchemy.orm import selectinload
 
 import database
 from endpoints import dependencies
 from models import poll as models
-from utils import page
+from utils import page, polls, questions, results, streams
 
 router = APIRouter(prefix="/poll", tags=["Poll"])
 
 
-@router.post("/add")
+@router.post("/add", dependencies=[dependencies.ClientLimit])
 async def add(
     user: dependencies.User,
     poll_schema: models.PollSchema,
@@ -23,29 +26,32 @@ async def add(
 
         session.add(poll)
         await session.flush()
-        await session.refresh(poll)
+        await results.reset(session, poll.id, poll_schema)
 
-        return models.Poll.from_orm(poll)
+        return polls.build(poll, user)
 
 
-@router.get("/get/id")
-async def get_by_id(id: int) -> models.Poll | None:
+@router.get("/get/id", response_model=models.Poll | None)
+async def get_by_id(
+    id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     async with database.sessions.begin() as session:
-        poll = await session.scalar(select(database.Poll).where(database.Poll.id == id))
+        entry = await polls.load(session, id)
 
-        if poll is None:
-            return None
+    if entry is None:
+        return Response(b"null", media_type="application/json")
+    if if_none_match == entry.etag:
+        return Response(status_code=304, headers={"ETag": entry.etag})
 
-        return models.Poll.from_orm(poll)
+    return Response(
+        entry.body,
+        media_type="application/json",
+        headers={"ETag": entry.etag},
+    )
 
 
-@router.get("/get/name")
-async def get_by_name(
-    name: str | None = None,
-    owner_id: int | None = None,
-    limit: int = Query(10, ge=1, le=20),
-    offset: int = Query(0, ge=0),
-) -> page.Page[models.Poll]:
+def search(name: str | None, owner_id: int | None) -> ColumnElement[bool]:
     conditions = []
     if name is not None:
         conditions.append(
@@ -53,19 +59,60 @@ async def get_by_name(
         )
     if owner_id is not None:
         conditions.append(database.Poll.owner_id == owner_id)
+    return and_(*conditions)
 
-    async with database.sessions.begin() as session:
+
+def relevance(name: str | None) -> list[ColumnElement[Any]]:
+    if name is None or database.engine.dialect.name != "postgresql":
+        return []
+    return [func.similarity(func.lower(database.Poll.name), name.lower(), type_=Float)]
+
+
+@router.get("/get/name")
+async def get_by_name(
+    name: str | None = None,
+    owner_id: int | None = None,
+    limit: int = Query(10, ge=1, le=20),
+    offset: int = Query(0, ge=0),
+) -> page.Page[models.Poll]:
+    async with database.replica_sessions.begin() as session:
         return await page.paginate(
             session,
             database.Poll,
-            and_(*conditions),
+            search(name, owner_id),
             limit,
             offset,
             models.Poll,
+            [*(r.desc() for r in relevance(name)), database.Poll.id],
+            [selectinload(database.Poll.owner)],
+        )
+
+
+@router.get("/get/name/cursor")
+async def get_by_name_cursor(
+    name: str | None = None,
+    owner_id: int | None = None,
+    limit: int = Query(10, ge=1, le=20),
+    cursor: str | None = None,
+    total: bool = False,
+) -> page.CursorPage[models.Poll]:
+    keys: list[Any] = [*relevance(name), database.Poll.id]
+    async with database.replica_sessions.begin() as session:
+        return await page.paginate_cursor(
+            session,
+            database.Poll,
+            search(name, owner_id),
+            keys,
+            limit,
+            cursor,
+            models.Poll,
+            descending=len(keys) > 1,
+            total=total,
+            options=[selectinload(database.Poll.owner)],
         )
 
 
-@router.put("/update")
+@router.put("/update", dependencies=[dependencies.ClientLimit])
 async def update(
     user: dependencies.User,
     id: int,
@@ -81,16 +128,22 @@ async def update(
 
         poll.name = poll_schema.name
         poll.poll = poll_schema.serializable()
+        poll.version += 1
         await session.flush()
 
         await session.execute(
             delete(database.Answer).where(database.Answer.poll_id == id)
         )
+        await results.reset(session, id, poll_schema)
+        poll_model = polls.build(poll, user)
 
-        return models.Poll.from_orm(poll)
+    await polls.invalidate(id)
+    await streams.reset(id)
+    await questions.clear(id)
+    return poll_model
 
 
-@router.delete("/delete")
+@router.delete("/delete", dependencies=[dependencies.ClientLimit])
 async def delete_poll(user: dependencies.User, id: int) -> models.Poll:
     async with database.sessions.begin() as session:
         poll = await session.scalar(select(database.Poll).where(database.Poll.id == id))
@@ -101,4 +154,9 @@ async def delete_poll(user: dependencies.User, id: int) -> models.Poll:
             raise HTTPException(405, "You are not the owner of this poll")
 
         await session.delete(poll)
-        return models.Poll.from_orm(poll)
+        poll_model = polls.build(poll, user)
+
+    await polls.invalidate(id)
+    await streams.reset(id)
+    await questions.clear(id)
+    return poll_model
@@ -10,23 +10,35 @@ import settings
 import models
 import database
 import endpoints
+from utils import broadcast, buffer, tracing
 
 logging.basicConfig(level=logging.INFO)
 
 app = FastAPI()
+app.add_middleware(tracing.TracingMiddleware)
 app.include_router(endpoints.router)
 
 
 @app.on_event("startup")
 async def init() -> None:
     logging.info("Creating tables in database")
-    async with database.engine.begin() as connection:
-        await connection.run_sync(database.Base.metadata.create_all)
-
-
-uvicorn.run(
-    app,
-    host="0.0.0.0",
-    port=settings.settings.port,
-    root_path=settings.settings.root_path,
-)
+    await database.init()
+    await broadcast.backend.start()
+    await buffer.buffer.start()
+    tracing.sampler.start()
+
+
+@app.on_event("shutdown")
+async def close() -> None:
+    await buffer.buffer.close()
+    await broadcast.backend.close()
+    tracing.sampler.close()
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=settings.settings.port,
+        root_path=settings.settings.root_path,
+    )
@@ -1,5 +1,27 @@
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
 import pydantic.generics
-import json
+
+
+scalars = (str, int, float, bool, type(None))
+
+
+def plain(value: Any) -> Any:
+    if type(value) in scalars:
+        return value
+    if isinstance(value, pydantic.BaseModel):
+        return {k: plain(v) for k, v in value.__dict__.items()}
+    if isinstance(value, dict):
+        return {k: plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [plain(v) for v in value]
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
 
 
 class BaseModel(pydantic.generics.GenericModel):
@@ -7,9 +29,10 @@ class BaseModel(pydantic.generics.GenericModel):
         orm_mode = True
 
     def serializable(self) -> dict:
-        return json.loads(self.json())
+        return plain(self)
 
 
 from . import account
 from . import poll
 from . import answers
+from . import results
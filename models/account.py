@@ -6,6 +6,7 @@ from models import BaseModel
 class User(BaseModel):
     id: int
     username: str
+    avatar: str | None = None
 
 
 class Auth(BaseModel):
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Any, TypeAlias
 from uuid import UUID
 
@@ -99,6 +100,15 @@ class AnswerSchema(BaseModel):
         return value
 
 
+def check(schema: poll.PollSchema, values: list[Value]) -> None:
+    checks = schema.checks
+    for v in values:
+        assert (
+            v.question_id in checks
+        ), f"Question with id {v.question_id} is not included in the poll"
+        checks[v.question_id](v)
+
+
 class Answer(BaseModel):
     id: int
     poll: poll.Poll
@@ -112,13 +122,24 @@ class Answer(BaseModel):
         values: dict[str, Any],
         **kwargs: Any,
     ) -> AnswerSchema:
-        uuids: dict[UUID, poll.Question] = values["poll"].poll.uuids
-        for v in value.values:
-            assert (
-                v.question_id in uuids
-            ), f"Question with id {v.question_id} is not included in the poll"
-            assert (
-                uuids[v.question_id].question_type == v.question_type
-            ), f"Question and value has different types ({v.question_type} != {uuids[v.question_id].question_type})"
-            v.check(uuids[v.question_id])  # type: ignore[arg-type]
+        check(values["poll"].poll, value.values)
         return value
+
+
+class Resync(BaseModel):
+    resync: bool = True
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class BulkError(BaseModel):
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class BulkResult(BaseModel):
+    ids: list[int | None] = []
+    errors: list[BulkError] = []
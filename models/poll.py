@@ -1,8 +1,8 @@
 from enum import IntEnum, auto
-from typing import Any, Literal, TypeAlias
+from typing import Any, Callable, Literal, TypeAlias
 from uuid import UUID, uuid4
 
-from pydantic import Field, validator
+from pydantic import Field, PrivateAttr, validator
 
 from models import BaseModel, account
 
@@ -124,6 +124,17 @@ class TextQuestion(BaseQuestion):
 
 
 Question: TypeAlias = SelectorQuestion | SliderQuestion | TopListQuestion | TextQuestion
+Check: TypeAlias = Callable[[Any], None]
+
+
+def compile_check(question: Question) -> Check:
+    def check(value: Any) -> None:
+        assert (
+            question.question_type == value.question_type
+        ), f"Question and value has different types ({value.question_type} != {question.question_type})"
+        value.check(question)
+
+    return check
 
 
 class PlotType(IntEnum):
@@ -221,9 +232,20 @@ class PollSchema(BaseModel):
     name: str = Field(min_length=1)
     plots: list[Plot] = []
 
+    _uuids: dict[UUID, Question] | None = PrivateAttr(None)
+    _checks: dict[UUID, Check] | None = PrivateAttr(None)
+
     @property
     def uuids(self) -> dict[UUID, Question]:
-        return {u: q for p in self.plots for u, q in p.uuids.items()}
+        if self._uuids is None:
+            self._uuids = {u: q for p in self.plots for u, q in p.uuids.items()}
+        return self._uuids
+
+    @property
+    def checks(self) -> dict[UUID, Check]:
+        if self._checks is None:
+            self._checks = {u: compile_check(q) for u, q in self.uuids.items()}
+        return self._checks
 
     @validator("plots")
     def plots_validator(
@@ -0,0 +1,113 @@
+import re
+from collections import Counter
+from typing import TypeAlias
+from uuid import UUID
+
+from models import BaseModel, answers, poll
+
+TERM = re.compile(r"\w+")
+TERM_LIMIT = 1000
+
+
+class BaseResult(BaseModel):
+    question_id: UUID
+    question_type: poll.QuestionType
+    total: int = 0
+
+
+class SelectorResult(BaseResult):
+    question_type = poll.QuestionType.selector
+    counts: list[int]
+
+    @classmethod
+    def empty(cls, question: poll.SelectorQuestion) -> "SelectorResult":
+        return cls(
+            question_id=question.question_id,
+            counts=[0] * len(question.options),
+        )
+
+    def add(self, value: answers.SelectorValue) -> None:
+        self.total += 1
+        for s in value.selected:
+            self.counts[s] += 1
+
+
+class SliderResult(BaseResult):
+    question_type = poll.QuestionType.slider
+    min_value: int
+    sums: list[int]
+    histograms: list[list[int]]
+
+    @classmethod
+    def empty(cls, question: poll.SliderQuestion) -> "SliderResult":
+        return cls(
+            question_id=question.question_id,
+            min_value=question.min_value,
+            sums=[0] * len(question.options),
+            histograms=[
+                [0] * (question.max_value - question.min_value + 1)
+                for _ in question.options
+            ],
+        )
+
+    def add(self, value: answers.SliderValue) -> None:
+        self.total += 1
+        for i, s in enumerate(value.sliders):
+            self.sums[i] += s
+            self.histograms[i][s - self.min_value] += 1
+
+
+class TopListResult(BaseResult):
+    question_type = poll.QuestionType.top_list
+    scores: list[int]
+
+    @classmethod
+    def empty(cls, question: poll.TopListQuestion) -> "TopListResult":
+        return cls(
+            question_id=question.question_id,
+            scores=[0] * len(question.options),
+        )
+
+    def add(self, value: answers.TopListValue) -> None:
+        self.total += 1
+        for position, rank in enumerate(value.ranks):
+            self.scores[rank] += len(self.scores) - position
+
+
+class TextResult(BaseResult):
+    question_type = poll.QuestionType.text
+    terms: dict[str, int] = {}
+
+    @classmethod
+    def empty(cls, question: poll.TextQuestion) -> "TextResult":
+        return cls(question_id=question.question_id)
+
+    def add(self, value: answers.TextValue) -> None:
+        self.total += 1
+        for term in TERM.findall(value.text.lower()):
+            self.terms[term] = self.terms.get(term, 0) + 1
+        if len(self.terms) > 2 * TERM_LIMIT:
+            self.terms = dict(Counter(self.terms).most_common(TERM_LIMIT))
+
+
+Result: TypeAlias = SelectorResult | SliderResult | TopListResult | TextResult
+
+result_types: dict[poll.QuestionType, type[Result]] = {
+    poll.QuestionType.selector: SelectorResult,
+    poll.QuestionType.slider: SliderResult,
+    poll.QuestionType.top_list: TopListResult,
+    poll.QuestionType.text: TextResult,
+}
+
+
+def empty(question: poll.Question) -> Result:
+    return result_types[question.question_type].empty(question)  # type: ignore[arg-type]
+
+
+def parse(data: dict) -> Result:
+    return result_types[data["question_type"]].parse_obj(data)
+
+
+class Snapshot(BaseModel):
+    seq: int
+    results: list[Result]
@@ -1,11 +1,70 @@
-from pydantic import BaseSettings, PostgresDsn
+from typing import Literal
+
+from pydantic import AnyUrl, BaseSettings, PostgresDsn
+
+
+class SqliteDsn(AnyUrl):
+    allowed_schemes = {"sqlite", "sqlite+aiosqlite"}
+    host_required = False
 
 
 class Settings(BaseSettings):
-    database: PostgresDsn
+    database: PostgresDsn | SqliteDsn
+    database_replica: PostgresDsn | None = None
+    pool_size: int = 5
+    pool_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = False
+    statement_cache_size: int = 100
+    connect_timeout: float = 60
+    command_timeout: float | None = None
     secret: str
     port: int
     root_path: str
+    broadcast: Literal["memory", "postgres"] = "memory"
+    broadcast_reconnect_interval: float = 1
+    listen_queue_size: int = 256
+    listen_overflow: Literal["drop_oldest", "resync", "disconnect"] = "drop_oldest"
+    listen_batch_window: float = 0.005
+    listen_resume_size: int = 1024
+    listen_resume_ttl: float = 30
+    listen_tick_interval: float = 0.25
+    password_workers: int = 4
+    password_scrypt_n: int = 16384
+    password_scrypt_r: int = 8
+    password_scrypt_p: int = 1
+    avatar_max_size: int = 524288
+    avatar_sizes: list[int] = [32, 64, 128]
+    avatar_cache_size: int = 1024
+    avatar_cache_ttl: float = 3600
+    avatar_max_age: int = 31536000
+    rate_limit: bool = False
+    rate_limit_client_rate: float = 20
+    rate_limit_client_burst: float = 60
+    rate_limit_poll_rate: float = 1000
+    rate_limit_poll_burst: float = 2000
+    rate_limit_size: int = 65536
+    user_cache_size: int = 4096
+    user_cache_ttl: float = 60
+    poll_cache_size: int = 1024
+    poll_cache_ttl: float = 300
+    question_cache_size: int = 4096
+    question_cache_ttl: float = 86400
+    bulk_size: int = 1000
+    bulk_chunk_size: int = 500
+    answer_buffer: bool = False
+    answer_buffer_size: int = 10000
+    answer_buffer_batch: int = 500
+    answer_buffer_interval: float = 0.05
+    answer_buffer_retry_max: float = 5
+    export_batch_size: int = 1000
+    export_chunk_size: int = 65536
+    profile: bool = False
+    profile_threshold: float = 0.5
+    profile_interval: float = 0.005
+    profile_samples: int = 100000
+    profile_directory: str = "profiles"
 
 
 settings = Settings()
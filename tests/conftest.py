@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+directory = tempfile.mkdtemp(prefix="pollify-tests-")
+os.environ.setdefault("DATABASE", f"sqlite+aiosqlite:///{directory}/tests.db")
+os.environ.setdefault("SECRET", "tests")
+os.environ.setdefault("PORT", "0")
+os.environ.setdefault("ROOT_PATH", "")
+os.environ.setdefault("RATE_LIMIT", "false")
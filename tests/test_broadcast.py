@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import database
+from models import answers, poll
+from utils import broadcast, questions, streams
+
+postgres = pytest.mark.skipif(
+    database.engine.dialect.name != "postgresql",
+    reason="DATABASE must point at PostgreSQL",
+)
+
+
+def test_pack_splits_by_size() -> None:
+    assert list(broadcast.pack(["aaa", "bbb", "ccc"], 8)) == ["aaa\nbbb", "ccc"]
+
+
+def test_memory_dispatches_locally() -> None:
+    async def scenario() -> list[str]:
+        backend = broadcast.MemoryBroadcast()
+        received: list[str] = []
+        await backend.subscribe("values_1", received.append)
+        await backend.publish("values_1", "frame")
+        await backend.publish("values_2", "other")
+        return received
+
+    assert asyncio.run(scenario()) == ["frame"]
+
+
+def test_postgres_rejects_oversized_messages() -> None:
+    backend = broadcast.PostgresBroadcast()
+    with pytest.raises(ValueError, match="too large"):
+        asyncio.run(backend.publish("questions", "x" * (backend.max_payload + 1)))
+
+
+class Recorder(broadcast.MemoryBroadcast):
+    max_payload = 64
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.published: list[tuple[str, str]] = []
+
+    async def publish(self, channel: str, message: str) -> None:
+        self.published.append((channel, message))
+
+
+def test_oversized_values_publish_a_resync(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = Recorder()
+    monkeypatch.setattr(broadcast, "backend", backend)
+    question = poll.TextQuestion(label="Words")
+    values: list[answers.Value] = [
+        answers.TextValue(question_id=question.question_id, text="short"),
+        answers.TextValue(question_id=question.question_id, text="long" * 100),
+    ]
+
+    asyncio.run(streams.publish(1, values, {question.question_id: 2}))
+    assert backend.published == [("values_1", streams.resync)]
+
+
+def test_oversized_questions_are_resolved(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = Recorder()
+    monkeypatch.setattr(broadcast, "backend", backend)
+    question = poll.TextQuestion(label="Words" * 100)
+    stored = poll.PollSchema(
+        name="Questions",
+        plots=[poll.WordCloudPlot(name="Words", questions=[question])],
+    )
+
+    async def get_poll(session: Any, poll_id: int) -> Any:
+        return SimpleNamespace(poll=stored)
+
+    monkeypatch.setattr(questions.polls, "get", get_poll)
+
+    async def scenario() -> str | None:
+        await questions.publish(1, question.json(), question.question_id)
+        channel, message = backend.published[0]
+        assert message == f"1\n{question.question_id}"
+        questions.dispatch(message)
+        await questions.resolving[1]
+        return questions.current.get(1)
+
+    assert asyncio.run(scenario()) == question.json()
+
+
+@postgres
+def test_postgres_delivers_across_workers() -> None:
+    async def scenario() -> str:
+        listener = broadcast.PostgresBroadcast()
+        publisher = broadcast.PostgresBroadcast()
+        received: asyncio.Queue[str] = asyncio.Queue()
+        try:
+            await listener.subscribe("values_test", received.put_nowait)
+            await publisher.publish("values_test", "frame")
+            return await asyncio.wait_for(received.get(), 5)
+        finally:
+            await listener.close()
+            await publisher.close()
+            await database.engine.dispose()
+
+    assert asyncio.run(scenario()) == "frame"
+
+
+@postgres
+def test_postgres_reconnects_and_resyncs() -> None:
+    async def scenario() -> str:
+        listener = broadcast.PostgresBroadcast()
+        publisher = broadcast.PostgresBroadcast()
+        received: asyncio.Queue[str] = asyncio.Queue()
+        resynced = asyncio.Event()
+        broadcast.resyncs.append(resynced.set)
+        try:
+            await listener.subscribe("values_test", received.put_nowait)
+            pid = listener.driver.get_server_pid()
+            await (await publisher.connect()).execute(
+                "SELECT pg_terminate_backend($1)", pid
+            )
+            await asyncio.wait_for(resynced.wait(), 10)
+
+            await publisher.publish("values_test", "after")
+            return await asyncio.wait_for(received.get(), 5)
+        finally:
+            broadcast.resyncs.remove(resynced.set)
+            await listener.close()
+            await publisher.close()
+            await database.engine.dispose()
+
+    assert asyncio.run(scenario()) == "after"
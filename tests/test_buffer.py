@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import exc
+
+from models import answers as models
+from utils import buffer
+
+
+def failing(*errors: Exception) -> Any:
+    remaining = list(errors)
+
+    async def add(session: Any, *args: Any) -> tuple[list[int], dict]:
+        if len(remaining) > 0:
+            raise remaining.pop(0)
+        return [], {}
+
+    return add
+
+
+def test_failed_writes_are_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    outage = exc.OperationalError("INSERT", {}, OSError("connection refused"))
+    monkeypatch.setattr(buffer.answers, "add", failing(outage))
+
+    async def scenario() -> tuple[int, int]:
+        pending = buffer.Buffer(size=2)
+        await pending.space.acquire()
+        item = (SimpleNamespace(id=1), 1, models.AnswerSchema(values=[]))
+        pending.items.append(item)  # type: ignore[arg-type]
+
+        assert not await pending.flush()
+        requeued = len(pending.items)
+        assert await pending.flush()
+        return requeued, len(pending.items)
+
+    assert asyncio.run(scenario()) == (1, 0)
+
+
+def test_rejected_writes_are_dropped(monkeypatch: pytest.MonkeyPatch) -> None:
+    missing = exc.IntegrityError("INSERT", {}, Exception("foreign key violation"))
+    monkeypatch.setattr(buffer.answers, "add", failing(missing))
+
+    async def scenario() -> int:
+        pending = buffer.Buffer(size=2)
+        await pending.space.acquire()
+        item = (SimpleNamespace(id=1), 1, models.AnswerSchema(values=[]))
+        pending.items.append(item)  # type: ignore[arg-type]
+
+        assert await pending.flush()
+        return len(pending.items)
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_put_fails_when_the_writer_stopped() -> None:
+    async def scenario() -> None:
+        pending = buffer.Buffer(size=1)
+        await pending.space.acquire()
+
+        async def crash() -> None:
+            raise RuntimeError("writer crashed")
+
+        pending.task = asyncio.create_task(crash())
+        pending.task.add_done_callback(pending.stopped)
+        await pending.put(SimpleNamespace(id=1), models.AnswerSchema(values=[]))  # type: ignore[arg-type]
+
+    with pytest.raises(HTTPException, match="not running"):
+        asyncio.run(scenario())
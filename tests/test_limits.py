@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+from endpoints import dependencies
+from main import app
+from settings import settings
+
+
+def test_limited_endpoint_authenticates_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = 0
+    authenticate = dependencies.authenticate
+
+    async def counted(token: str) -> database.User:
+        nonlocal calls
+        calls += 1
+        return await authenticate(token)
+
+    with TestClient(app) as client:
+        token = client.post(
+            "/account/register", json={"username": "limits", "password": "password"}
+        ).json()["token"]
+
+        monkeypatch.setattr(settings, "rate_limit", True)
+        monkeypatch.setattr(dependencies, "authenticate", counted)
+        response = client.put(
+            "/account/update/username",
+            json={"username": "limited"},
+            headers={"x-token": token},
+        )
+
+    assert response.status_code == 200
+    assert calls == 1
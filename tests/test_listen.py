@@ -0,0 +1,38 @@
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from endpoints import answers
+from main import app
+from utils import broadcast, streams
+
+
+def test_listener_stops_on_disconnect() -> None:
+    client = TestClient(app)
+    with client.websocket_connect("/answers/listen/questions?poll_id=1"):
+        assert 1 in answers.questions_pull
+
+    assert 1 not in answers.questions_pull
+
+
+def test_failed_load_is_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    failures = [OSError("unavailable")]
+
+    async def get_poll(session: Any, poll_id: int) -> None:
+        if len(failures) > 0:
+            raise failures.pop()
+        return None
+
+    monkeypatch.setattr(streams.polls, "get", get_poll)
+    client = TestClient(app)
+
+    with pytest.raises(OSError):
+        with client.websocket_connect("/answers/listen/values?poll_id=2"):
+            pass
+
+    assert 2 not in streams.streams
+    assert "values_2" not in broadcast.backend.callbacks
+
+    with client.websocket_connect("/answers/listen/values?poll_id=2") as websocket:
+        assert websocket.receive_json()["results"] == []
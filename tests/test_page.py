@@ -0,0 +1,20 @@
+import pytest
+from fastapi import HTTPException
+
+from utils import page
+
+
+def test_cursor_round_trip() -> None:
+    cursor = page.encode_cursor([0.5, 3])
+    assert page.decode_cursor(cursor, [float, int]) == [0.5, 3]
+
+
+@pytest.mark.parametrize("keys", [["x"], [True], [1.5], [1, 2], {"id": 1}])
+def test_cursor_rejects_mismatched_keys(keys: object) -> None:
+    with pytest.raises(HTTPException):
+        page.decode_cursor(page.encode_cursor(keys), [int])  # type: ignore[arg-type]
+
+
+def test_cursor_rejects_garbage() -> None:
+    with pytest.raises(HTTPException):
+        page.decode_cursor("not a cursor!", [int])
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+import database
+from main import app
+from utils import passwords
+
+
+def test_hash_round_trip() -> None:
+    async def scenario() -> tuple[bool, bool]:
+        stored = await passwords.hash("password", "salt")
+        return (
+            await passwords.verify("password", "salt", stored),
+            await passwords.verify("wrong", "salt", stored),
+        )
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_dummy_costs_a_hash() -> None:
+    before = passwords.hashes.values.get((), 0)
+    assert asyncio.run(passwords.dummy("password")) is False
+    assert passwords.hashes.values[()] == before + 1
+
+
+def test_queue_depth_settles() -> None:
+    async def scenario() -> None:
+        await asyncio.gather(*(passwords.hash("password", "salt") for _ in range(8)))
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert passwords.queued == 0
+
+
+def test_login_upgrade_keeps_a_concurrent_password_change(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    with TestClient(app) as client:
+        client.post(
+            "/account/register", json={"username": "upgrade", "password": "old"}
+        )
+
+        async def downgrade() -> None:
+            async with database.sessions.begin() as session:
+                await session.execute(
+                    update(database.User)
+                    .where(database.User.username == "upgrade")
+                    .values(salt="salt", password=passwords.legacy("old", "salt"))
+                )
+
+        client.portal.call(downgrade)  # type: ignore[union-attr]
+        hash = passwords.hash
+
+        async def racing(password: str, salt: str) -> str:
+            async with database.sessions.begin() as session:
+                await session.execute(
+                    update(database.User)
+                    .where(database.User.username == "upgrade")
+                    .values(salt="new", password=passwords.legacy("new", "new"))
+                )
+            return await hash(password, salt)
+
+        monkeypatch.setattr(passwords, "hash", racing)
+        upgraded = client.post(
+            "/account/login", json={"username": "upgrade", "password": "old"}
+        )
+        monkeypatch.setattr(passwords, "hash", hash)
+        changed = client.post(
+            "/account/login", json={"username": "upgrade", "password": "new"}
+        )
+
+    assert upgraded.status_code == 403
+    assert changed.status_code == 200
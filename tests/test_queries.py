@@ -0,0 +1,174 @@
+from typing import Any, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import database
+from endpoints import dependencies
+from main import app
+from models import poll
+from utils import polls, questions
+
+POLL = poll.PollSchema(
+    name="Queries",
+    plots=[
+        poll.BarPlot(
+            name="Choice",
+            questions=[
+                poll.SelectorQuestion(
+                    label="Pick",
+                    options=[
+                        poll.Option(label="a", image=None),
+                        poll.Option(label="b", image=None),
+                    ],
+                )
+            ],
+        ),
+        poll.WordCloudPlot(
+            name="Words",
+            questions=[poll.TextQuestion(label="Say")],
+        ),
+    ],
+).serializable()
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.queries = 0
+
+    def __call__(self, *args: Any) -> None:
+        self.queries += 1
+
+
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def context(client: TestClient) -> dict[str, Any]:
+    token = client.post(
+        "/account/register", json={"username": "queries", "password": "password"}
+    ).json()
+    headers = {"x-token": token["token"]}
+    created = client.post("/poll/add", json=POLL, headers=headers).json()
+    selector, text = (
+        question["question_id"]
+        for plot in created["poll"]["plots"]
+        for question in plot["questions"]
+    )
+    answer = client.post(
+        "/answers/add/answer",
+        params={"poll_id": created["id"]},
+        json={
+            "values": [{"question_id": selector, "question_type": 1, "selected": [0]}]
+        },
+        headers=headers,
+    ).json()
+    return {
+        "headers": headers,
+        "user_id": token["id"],
+        "poll_id": created["id"],
+        "selector": selector,
+        "text": text,
+        "answer_id": answer["id"],
+    }
+
+
+def count(client: TestClient, method: str, path: str, **options: Any) -> int:
+    dependencies.users.clear()
+    polls.parsed.clear()
+    questions.current.clear()
+
+    counter = Counter()
+    event.listen(database.engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        response = client.request(method, path, **options)
+    finally:
+        event.remove(database.engine.sync_engine, "before_cursor_execute", counter)
+
+    assert response.status_code == 200, response.text
+    return counter.queries
+
+
+QUERIES = {
+    "/account/me": 1,
+    "/account/get/id": 1,
+    "/account/get/username": 1,
+    "/poll/get/id": 1,
+    "/poll/get/name": 3,
+    "/poll/get/name/cursor": 2,
+    "/answers/add/value": 5,
+    "/answers/add/answer": 5,
+    "/answers/add/bulk": 7,
+    "/answers/send/question": 2,
+    "/answers/get/id": 3,
+    "/answers/get/my": 3,
+    "/answers/get/values": 2,
+    "/answers/get/results": 3,
+}
+
+
+def request(context: dict[str, Any], path: str) -> tuple[str, dict[str, Any]]:
+    headers, poll_id = context["headers"], context["poll_id"]
+    text = {"question_id": context["text"], "question_type": 4, "text": "hi"}
+    requests: dict[str, tuple[str, dict[str, Any]]] = {
+        "/account/me": ("GET", {"headers": headers}),
+        "/account/get/id": ("GET", {"params": {"id": context["user_id"]}}),
+        "/account/get/username": ("GET", {"params": {"username": "queries"}}),
+        "/poll/get/id": ("GET", {"params": {"id": poll_id}}),
+        "/poll/get/name": ("GET", {"params": {"name": "Queries"}}),
+        "/poll/get/name/cursor": ("GET", {"params": {"name": "Queries"}}),
+        "/answers/add/value": ("POST", {"params": {"poll_id": poll_id}, "json": text}),
+        "/answers/add/answer": (
+            "POST",
+            {"params": {"poll_id": poll_id}, "json": {"values": [text]}},
+        ),
+        "/answers/add/bulk": (
+            "POST",
+            {"params": {"poll_id": poll_id}, "json": [{"values": [text]}] * 3},
+        ),
+        "/answers/send/question": (
+            "POST",
+            {
+                "params": {"poll_id": poll_id, "question_id": context["text"]},
+                "headers": headers,
+            },
+        ),
+        "/answers/get/id": (
+            "GET",
+            {"params": {"id": context["answer_id"]}, "headers": headers},
+        ),
+        "/answers/get/my": (
+            "GET",
+            {"params": {"poll_id": poll_id}, "headers": headers},
+        ),
+        "/answers/get/values": (
+            "GET",
+            {"params": {"poll_id": poll_id}, "headers": headers},
+        ),
+        "/answers/get/results": (
+            "GET",
+            {"params": {"poll_id": poll_id}, "headers": headers},
+        ),
+    }
+    return requests[path]
+
+
+@pytest.mark.parametrize("path", QUERIES)
+def test_query_count(client: TestClient, context: dict[str, Any], path: str) -> None:
+    method, options = request(context, path)
+    assert count(client, method, path, **options) == QUERIES[path]
+
+
+def test_listing_values_does_not_grow_with_answers(
+    client: TestClient,
+    context: dict[str, Any],
+) -> None:
+    method, options = request(context, "/answers/get/values")
+    before = count(client, method, "/answers/get/values", **options)
+    request_method, bulk = request(context, "/answers/add/bulk")
+    client.request(request_method, "/answers/add/bulk", **bulk)
+    assert count(client, method, "/answers/get/values", **options) == before
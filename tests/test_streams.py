@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from models import answers, poll, results
+from utils import streams
+
+
+def test_load_skips_values_it_already_counted(monkeypatch: pytest.MonkeyPatch) -> None:
+    question = poll.TextQuestion(label="Words")
+    loaded = results.TextResult(question_id=question.question_id, total=2)
+    started = asyncio.Event()
+
+    async def get_poll(session: Any, poll_id: int) -> object:
+        await started.wait()
+        return object()
+
+    async def get_results(session: Any, poll_model: Any) -> list[results.Result]:
+        return [loaded]
+
+    monkeypatch.setattr(streams.polls, "get", get_poll)
+    monkeypatch.setattr(streams.stored, "get", get_results)
+
+    def frames(*texts: str) -> list[str]:
+        values: list[answers.Value] = [
+            answers.TextValue(question_id=question.question_id, text=text)
+            for text in texts
+        ]
+        return streams.encode(values, {question.question_id: len(texts) + 1})
+
+    async def scenario() -> tuple[list[str | None], results.Result, str | None]:
+        stream = streams.Stream(1)
+        pushed = [stream.push(frame) for frame in frames("counted", "new")]
+        started.set()
+        await stream.loading
+        duplicate = stream.push(frames("counted", "new")[0])
+        assert stream.results is not None
+        return pushed, stream.results[question.question_id], duplicate
+
+    pushed, result, duplicate = asyncio.run(scenario())
+    assert all(message is not None for message in pushed)
+    assert result.total == 3
+    assert duplicate is None
+
+
+def test_encode_numbers_values_per_question() -> None:
+    first, second = uuid4(), uuid4()
+    values: list[answers.Value] = [
+        answers.TextValue(question_id=first, text="a"),
+        answers.TextValue(question_id=second, text="b"),
+        answers.TextValue(question_id=first, text="c"),
+    ]
+    encoded = streams.encode(values, {first: 7, second: 3})
+    assert [frame.split(" ", 1)[0] for frame in encoded] == ["6", "3", "7"]
@@ -0,0 +1,62 @@
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+from models import answers, poll
+from utils import results, values
+
+
+async def add(
+    session: AsyncSession,
+    poll_model: poll.Poll,
+    schemas: list[answers.AnswerSchema],
+    reserved: list[int] | None = None,
+) -> tuple[list[int], dict[UUID, int]]:
+    if len(schemas) == 0:
+        return [], {}
+
+    documents: list[dict[str, Any]] = [
+        {
+            "poll_id": poll_model.id,
+            "answerer_id": None,
+            "answer": schema.serializable(),
+        }
+        for schema in schemas
+    ]
+
+    if reserved is not None:
+        ids = reserved
+        await session.execute(
+            insert(database.Answer),
+            [{"id": i, **document} for i, document in zip(ids, documents)],
+        )
+    else:
+        ids = list(
+            (
+                await session.execute(
+                    insert(database.Answer).returning(
+                        database.Answer.id,
+                        sort_by_parameter_order=True,
+                    ),
+                    documents,
+                )
+            ).scalars()
+        )
+
+    rows = [
+        values.row(answer_id, poll_model.id, value)
+        for answer_id, schema in zip(ids, schemas)
+        for value in schema.values
+    ]
+    if len(rows) > 0:
+        await session.execute(insert(database.AnswerValue), rows)
+
+    totals = await results.apply(
+        session,
+        poll_model,
+        [value for schema in schemas for value in schema.values],
+    )
+    return ids, totals
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import os
+import secrets
+
+from aiofiles import open
+from fastapi import HTTPException, UploadFile
+
+from settings import settings
+from utils import cache
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # type: ignore[assignment]
+
+directory = "./files/avatars"
+signature = b"\x89PNG\r\n\x1a\n"
+chunk_size = 65536
+
+thumbnails: cache.Cache[tuple[str, int], bytes] = cache.Cache(
+    "avatars",
+    settings.avatar_cache_size,
+    settings.avatar_cache_ttl,
+)
+
+
+def path(digest: str, size: int | None = None) -> str:
+    if size is None:
+        return f"{directory}/{digest}.png"
+    return f"{directory}/{digest}-{size}.png"
+
+
+def variant(size: int | None) -> int | None:
+    if size is None or Image is None:
+        return None
+    return next((s for s in sorted(settings.avatar_sizes) if s >= size), None)
+
+
+def resize(digest: str) -> None:
+    with Image.open(path(digest)) as image:
+        for size in settings.avatar_sizes:
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size))
+            thumbnail.save(path(digest, size), "PNG", optimize=True)
+
+
+async def store(file: UploadFile) -> str:
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{directory}/{secrets.token_hex(8)}.upload"
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with open(temporary, "wb") as output:
+            while chunk := await file.read(chunk_size):
+                if size == 0 and not chunk.startswith(signature):
+                    raise HTTPException(
+                        400, "Unsupported file type. Only png files are allowed."
+                    )
+
+                size += len(chunk)
+                if size > settings.avatar_max_size:
+                    raise HTTPException(
+                        400,
+                        "The file is to large. "
+                        f"Max size {settings.avatar_max_size // 1024}KiB",
+                    )
+
+                digest.update(chunk)
+                await output.write(chunk)
+
+        if size == 0:
+            raise HTTPException(
+                400, "Unsupported file type. Only png files are allowed."
+            )
+
+        stored = digest.hexdigest()
+        if not os.path.exists(path(stored)):
+            os.replace(temporary, path(stored))
+            if Image is not None:
+                try:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, resize, stored
+                    )
+                except OSError:
+                    os.remove(path(stored))
+                    raise HTTPException(400, "Image is invalid")
+
+        return stored
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+async def read(digest: str, size: int | None) -> bytes:
+    if size is not None:
+        cached = thumbnails.get((digest, size))
+        if cached is not None:
+            return cached
+
+    try:
+        async with open(path(digest, size), "rb") as file:
+            data = await file.read()
+    except FileNotFoundError:
+        if size is None:
+            raise
+        return await read(digest, None)
+
+    if size is not None:
+        thumbnails.set((digest, size), data)
+    return data
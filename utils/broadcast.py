@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import sys
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+import database
+from settings import settings
+
+Callback = Callable[[str], None]
+
+
+def pack(frames: list[str], size: int) -> Iterator[str]:
+    batch: list[str] = []
+    length = 0
+    for frame in frames:
+        frame_length = len(frame.encode("UTF-8")) + 1
+        if len(batch) > 0 and length + frame_length > size:
+            yield "\n".join(batch)
+            batch, length = [], 0
+        batch.append(frame)
+        length += frame_length
+    if len(batch) > 0:
+        yield "\n".join(batch)
+
+
+class Broadcast(ABC):
+    max_payload = sys.maxsize
+
+    def __init__(self) -> None:
+        self.callbacks: dict[str, Callback] = {}
+
+    async def subscribe(self, channel: str, callback: Callback) -> None:
+        self.callbacks[channel] = callback
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.callbacks.pop(channel, None)
+
+    def dispatch(self, channel: str, message: str) -> None:
+        if channel in self.callbacks:
+            self.callbacks[channel](message)
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        pass
+
+    async def start(self) -> None:
+        for channel, callback in channels.items():
+            await self.subscribe(channel, callback)
+
+    async def close(self) -> None:
+        self.callbacks.clear()
+
+
+class MemoryBroadcast(Broadcast):
+    async def publish(self, channel: str, message: str) -> None:
+        self.dispatch(channel, message)
+
+
+class PostgresBroadcast(Broadcast):
+    max_payload = 7999
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.connection: AsyncConnection | None = None
+        self.driver: Any = None
+        self.lock = asyncio.Lock()
+        self.reconnecting: asyncio.Task[None] | None = None
+
+    def notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.dispatch(channel, payload)
+
+    def terminate(self, connection: Any) -> None:
+        logging.warning("Broadcast connection lost, reconnecting")
+        stale = self.connection
+        self.connection = None
+        self.driver = None
+        self.reconnecting = asyncio.get_running_loop().create_task(
+            self.reconnect(stale)
+        )
+
+    async def reconnect(self, stale: AsyncConnection | None) -> None:
+        if stale is not None:
+            with suppress(exc.SQLAlchemyError, OSError):
+                await stale.invalidate()
+
+        while True:
+            try:
+                async with self.lock:
+                    await self.connect()
+                break
+            except (exc.SQLAlchemyError, OSError):
+                logging.warning("Broadcast reconnect failed, retrying")
+                await asyncio.sleep(settings.broadcast_reconnect_interval)
+
+        logging.info("Broadcast connection restored, resyncing listeners")
+        for callback in resyncs:
+            callback()
+
+    async def connect(self) -> Any:
+        if self.driver is None:
+            self.connection = await database.engine.connect()
+            raw = await self.connection.get_raw_connection()
+            driver: Any = raw.driver_connection
+            driver.add_termination_listener(self.terminate)
+            for channel in self.callbacks:
+                await driver.add_listener(channel, self.notify)
+            self.driver = driver
+        return self.driver
+
+    async def subscribe(self, channel: str, callback: Callback) -> None:
+        async with self.lock:
+            driver = await self.connect()
+            await super().subscribe(channel, callback)
+            await driver.add_listener(channel, self.notify)
+
+    async def unsubscribe(self, channel: str) -> None:
+        async with self.lock:
+            await super().unsubscribe(channel)
+            if self.driver is not None:
+                await self.driver.remove_listener(channel, self.notify)
+
+    async def publish(self, channel: str, message: str) -> None:
+        if len(message.encode("UTF-8")) > self.max_payload:
+            raise ValueError("Message is too large to broadcast")
+
+        async with self.lock:
+            await (await self.connect()).execute(
+                "SELECT pg_notify($1, $2)", channel, message
+            )
+
+    async def close(self) -> None:
+        if self.reconnecting is not None:
+            self.reconnecting.cancel()
+        async with self.lock:
+            await super().close()
+            if self.driver is not None:
+                self.driver.remove_termination_listener(self.terminate)
+            if self.connection is not None:
+                await self.connection.close()
+            self.connection = None
+            self.driver = None
+
+
+channels: dict[str, Callback] = {}
+resyncs: list[Callable[[], None]] = []
+backends: dict[str, type[Broadcast]] = {
+    "memory": MemoryBroadcast,
+    "postgres": PostgresBroadcast,
+}
+
+backend = backends[settings.broadcast]()
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from collections import deque
+
+from fastapi import HTTPException
+from sqlalchemy import exc, text
+
+import database
+from models import answers as models
+from models import poll
+from settings import settings
+from utils import answers, metrics, streams
+
+Item = tuple[poll.Poll, int, models.AnswerSchema]
+
+flushed = metrics.Counter(
+    "pollify_answer_buffer_flushed_total",
+    "Buffered answers written to the database",
+)
+dropped = metrics.Counter(
+    "pollify_answer_buffer_dropped_total",
+    "Buffered answers that failed to be written",
+)
+retried = metrics.Counter(
+    "pollify_answer_buffer_retried_total",
+    "Buffered answers requeued after a failed write",
+)
+depth = metrics.Gauge("pollify_answer_buffer_depth", "Answers waiting to be written")
+
+
+class Buffer:
+    def __init__(
+        self,
+        size: int = settings.answer_buffer_size,
+        batch: int = settings.answer_buffer_batch,
+        interval: float = settings.answer_buffer_interval,
+    ) -> None:
+        self.size = size
+        self.batch = batch
+        self.interval = interval
+        self.enabled = False
+        self.closing = False
+        self.items: list[Item] = []
+        self.ids: deque[int] = deque()
+        self.space = asyncio.Semaphore(size)
+        self.reserving = asyncio.Lock()
+        self.wake = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        depth.track(lambda: len(self.items))
+
+    async def start(self) -> None:
+        if not settings.answer_buffer:
+            return
+        if database.engine.dialect.name != "postgresql":
+            logging.warning("Answer buffer needs PostgreSQL sequences, disabled")
+            return
+
+        self.enabled = True
+        self.task = asyncio.create_task(self.run())
+        self.task.add_done_callback(self.stopped)
+
+    def stopped(self, task: asyncio.Task[None]) -> None:
+        self.enabled = False
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("Answer buffer stopped", exc_info=task.exception())
+        self.release(self.size)
+
+    async def reserve(self) -> int:
+        async with self.reserving:
+            if len(self.ids) == 0:
+                async with database.engine.connect() as connection:
+                    self.ids.extend(
+                        (
+                            await connection.execute(
+                                text(
+                                    "SELECT nextval(pg_get_serial_sequence"
+                                    "('answers', 'id')) "
+                                    "FROM generate_series(1, :count)"
+                                ),
+                                {"count": self.batch},
+                            )
+                        ).scalars()
+                    )
+            return self.ids.popleft()
+
+    async def put(self, poll_model: poll.Poll, schema: models.AnswerSchema) -> int:
+        await self.space.acquire()
+        if self.task is None or self.task.done():
+            self.space.release()
+            raise HTTPException(503, "Answer buffer is not running")
+
+        answer_id = await self.reserve()
+        self.items.append((poll_model, answer_id, schema))
+        if len(self.items) >= self.batch:
+            self.wake.set()
+        return answer_id
+
+    async def run(self) -> None:
+        backoff = 0.0
+        while not self.closing:
+            if backoff > 0:
+                await asyncio.sleep(backoff)
+            else:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            self.wake.clear()
+
+            try:
+                written = await self.flush()
+            except Exception:
+                logging.exception("Failed to flush buffered answers")
+                written = False
+
+            backoff = (
+                0
+                if written
+                else min(
+                    max(backoff * 2, self.interval), settings.answer_buffer_retry_max
+                )
+            )
+
+    async def flush(self) -> bool:
+        items, self.items = self.items, []
+        grouped: dict[int, list[Item]] = {}
+        for item in items:
+            grouped.setdefault(item[0].id, []).append(item)
+
+        failed: list[Item] = []
+        for group in grouped.values():
+            schemas = [schema for _, _, schema in group]
+            try:
+                async with database.sessions.begin() as session:
+                    _, totals = await answers.add(
+                        session,
+                        group[0][0],
+                        schemas,
+                        [answer_id for _, answer_id, _ in group],
+                    )
+            except (exc.IntegrityError, exc.DataError, exc.ProgrammingError):
+                logging.exception(f"Dropped {len(group)} buffered answers")
+                dropped.inc(len(group))
+                self.release(len(group))
+                continue
+            except Exception:
+                logging.exception(f"Failed to write {len(group)} buffered answers")
+                retried.inc(len(group))
+                failed.extend(group)
+                continue
+
+            self.release(len(group))
+            flushed.inc(len(group))
+            try:
+                await streams.publish(
+                    group[0][0].id,
+                    [value for schema in schemas for value in schema.values],
+                    totals,
+                )
+            except Exception:
+                logging.exception(f"Failed to broadcast {len(group)} buffered answers")
+
+        self.items = failed + self.items
+        return len(failed) == 0
+
+    def release(self, count: int) -> None:
+        for _ in range(count):
+            self.space.release()
+
+    async def close(self) -> None:
+        self.enabled = False
+        self.closing = True
+        self.wake.set()
+        if self.task is not None:
+            await self.task
+            self.task = None
+        if not await self.flush():
+            logging.error(f"Dropped {len(self.items)} buffered answers on shutdown")
+            dropped.inc(len(self.items))
+            self.items = []
+
+
+buffer = Buffer()
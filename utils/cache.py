@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Generic, Hashable, TypeVar
+
+from utils import metrics
+
+Key = TypeVar("Key", bound=Hashable)
+Value = TypeVar("Value")
+
+hits = metrics.Counter("pollify_cache_hits_total", "Cache hits")
+misses = metrics.Counter("pollify_cache_misses_total", "Cache misses")
+size = metrics.Gauge("pollify_cache_size", "Cached entries")
+
+
+class Cache(Generic[Key, Value]):
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.items: OrderedDict[Key, tuple[float, Value]] = OrderedDict()
+        size.track(lambda: len(self.items), cache=name)
+
+    def get(self, key: Key) -> Value | None:
+        item = self.items.get(key)
+        if item is None or item[0] < monotonic():
+            if item is not None:
+                del self.items[key]
+            misses.inc(cache=self.name)
+            return None
+
+        self.items.move_to_end(key)
+        hits.inc(cache=self.name)
+        return item[1]
+
+    def set(self, key: Key, value: Value) -> None:
+        self.items[key] = (monotonic() + self.ttl, value)
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def pop(self, key: Key) -> None:
+        self.items.pop(key, None)
+
+    def clear(self) -> None:
+        self.items.clear()
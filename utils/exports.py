@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import select
+
+import database
+from models import poll
+from settings import settings
+
+
+def cell(value: dict[str, Any]) -> str:
+    match value["question_type"]:
+        case poll.QuestionType.selector:
+            return ";".join(map(str, sorted(value["selected"])))
+        case poll.QuestionType.slider:
+            return ";".join(map(str, value["sliders"]))
+        case poll.QuestionType.top_list:
+            return ";".join(map(str, value["ranks"]))
+        case _:
+            return value["text"]
+
+
+async def rows(poll_id: int, columns: list[UUID]) -> AsyncIterator[list[Any]]:
+    keys = [str(c) for c in columns]
+    async with database.sessions.begin() as session:
+        result = await session.stream(
+            select(
+                database.Answer.id,
+                database.Answer.answerer_id,
+                database.Answer.answer,
+            )
+            .where(database.Answer.poll_id == poll_id)
+            .order_by(database.Answer.id)
+            .execution_options(yield_per=settings.export_batch_size)
+        )
+
+        async for answer in result:
+            cells = {v["question_id"]: cell(v) for v in answer.answer["values"]}
+            yield [answer.id, answer.answerer_id, *(cells.get(k, "") for k in keys)]
+
+
+def header(columns: list[UUID]) -> list[str]:
+    return ["id", "answerer_id", *map(str, columns)]
+
+
+async def csv_stream(poll_id: int, columns: list[UUID]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header(columns))
+
+    async for row in rows(poll_id, columns):
+        writer.writerow(row)
+        if buffer.tell() >= settings.export_chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+async def ndjson_stream(poll_id: int, columns: list[UUID]) -> AsyncIterator[str]:
+    keys = header(columns)
+    lines: list[str] = []
+    size = 0
+
+    async for row in rows(poll_id, columns):
+        lines.append(json.dumps(dict(zip(keys, row))) + "\n")
+        size += len(lines[-1])
+        if size >= settings.export_chunk_size:
+            yield "".join(lines)
+            lines, size = [], 0
+
+    yield "".join(lines)
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from math import ceil
+from time import monotonic
+from typing import Hashable
+
+from fastapi import HTTPException
+
+from utils import metrics
+
+rejected = metrics.Counter("pollify_rate_limited_total", "Requests rejected by limiter")
+size = metrics.Gauge("pollify_rate_limit_keys", "Tracked rate limit keys")
+
+
+class Limiter:
+    def __init__(self, name: str, rate: float, burst: float, maxsize: int) -> None:
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self.idle = burst / rate
+        self.buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+        size.track(lambda: len(self.buckets), limiter=name)
+
+    def evict(self, now: float) -> None:
+        while len(self.buckets) > 0:
+            key, (_, updated) = next(iter(self.buckets.items()))
+            if now - updated < self.idle and len(self.buckets) < self.maxsize:
+                return
+            self.buckets.popitem(last=False)
+
+    def take(self, key: Hashable) -> float:
+        now = monotonic()
+        tokens, updated = self.buckets.pop(key, (self.burst, now))
+        self.evict(now)
+
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self.buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+        self.buckets[key] = (tokens - 1, now)
+        return 0
+
+    def check(self, key: Hashable) -> None:
+        wait = self.take(key)
+        if wait > 0:
+            rejected.inc(limiter=self.name)
+            raise HTTPException(
+                429,
+                "Too many requests",
+                headers={"Retry-After": str(ceil(wait))},
+            )
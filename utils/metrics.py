@@ -0,0 +1,122 @@
+from bisect import bisect_left
+from typing import Callable, Iterator, TypeAlias
+
+Labels: TypeAlias = tuple[tuple[str, str], ...]
+Sample: TypeAlias = tuple[str, Labels, float]
+
+
+def labels_key(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(labels: Labels) -> str:
+    if len(labels) == 0:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        registry.append(self)
+
+    def samples(self) -> Iterator[Sample]:
+        yield from ()
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = labels_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in self.values.items():
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self.functions: dict[Labels, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[labels_key(labels)] = value
+
+    def track(self, function: Callable[[], float], **labels: str) -> None:
+        self.functions[labels_key(labels)] = function
+
+    def samples(self) -> Iterator[Sample]:
+        yield from super().samples()
+        for labels, function in self.functions.items():
+            yield self.name, labels, function()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = (
+            0.005,
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1,
+            2.5,
+            5,
+            10,
+        ),
+    ) -> None:
+        super().__init__(name, documentation)
+        self.buckets = buckets
+        self.counts: dict[Labels, list[int]] = {}
+        self.sums: dict[Labels, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = labels_key(labels)
+        if key not in self.counts:
+            self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0
+        self.counts[key][bisect_left(self.buckets, value)] += 1
+        self.sums[key] += value
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, counts in self.counts.items():
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                total += count
+                yield f"{self.name}_bucket", (*labels, ("le", str(bound))), total
+            yield f"{self.name}_sum", labels, self.sums[labels]
+            yield f"{self.name}_count", labels, total
+
+
+registry: list[Metric] = []
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in registry) + "\n"
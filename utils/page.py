@@ -1,9 +1,14 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from math import ceil
-from typing import Generic, TypeVar
+from typing import Any, Generic, TypeVar
 
 from fastapi import HTTPException
-from sqlalchemy import ColumnElement, func, select
+from sqlalchemy import ColumnElement, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.base import ExecutableOption
 
 from database import Base
 from models import BaseModel
@@ -17,6 +22,32 @@ class Page(BaseModel, Generic[Model]):
     items: list[Model] = []
 
 
+class CursorPage(BaseModel, Generic[Model]):
+    next: str | None = None
+    total: int | None = None
+    items: list[Model] = []
+
+
+def encode_cursor(keys: list[Any]) -> str:
+    return urlsafe_b64encode(json.dumps(keys).encode("UTF-8")).decode("ASCII")
+
+
+def decode_cursor(cursor: str, types: list[type]) -> list[Any]:
+    try:
+        keys = json.loads(urlsafe_b64decode(cursor.encode("ASCII")))
+    except (ValueError, binascii.Error):
+        raise HTTPException(400, "Cursor is invalid")
+
+    if (
+        not isinstance(keys, list)
+        or len(keys) != len(types)
+        or any(type(key) is not kind for key, kind in zip(keys, types))
+    ):
+        raise HTTPException(400, "Cursor is invalid")
+
+    return keys
+
+
 async def paginate(
     session: AsyncSession,
     table: type[Table],
@@ -24,6 +55,8 @@ async def paginate(
     limit: int,
     offset: int,
     model: type[Model],
+    order: list[ColumnElement[Any] | InstrumentedAttribute[Any]] = [],
+    options: list[ExecutableOption] = [],
 ) -> Page[Model]:
     total = (
         ceil(
@@ -48,7 +81,54 @@ async def paginate(
         items=[
             model.from_orm(item)
             for item in await session.scalars(
-                select(table).where(expression).limit(limit).offset(offset * limit)
+                select(table)
+                .options(*options)
+                .where(expression)
+                .order_by(*order)
+                .limit(limit)
+                .offset(offset * limit)
             )
         ],
     )
+
+
+async def paginate_cursor(
+    session: AsyncSession,
+    table: type[Table],
+    expression: ColumnElement[bool],
+    keys: list[ColumnElement[Any] | InstrumentedAttribute[Any]],
+    limit: int,
+    cursor: str | None,
+    model: type[Model],
+    descending: bool = False,
+    total: bool = False,
+    options: list[ExecutableOption] = [],
+) -> CursorPage[Model]:
+    query = select(table, *keys).options(*options).where(expression)
+
+    if cursor is not None:
+        position = tuple_(*keys)
+        values = tuple_(*decode_cursor(cursor, [key.type.python_type for key in keys]))
+        query = query.where(position < values if descending else position > values)
+
+    rows = (
+        await session.execute(
+            query.order_by(*(k.desc() if descending else k for k in keys)).limit(
+                limit + 1
+            )
+        )
+    ).all()
+
+    return CursorPage(
+        next=encode_cursor(list(rows[limit - 1][1:])) if len(rows) > limit else None,
+        total=(
+            (
+                await session.scalars(
+                    select(func.count()).select_from(table).where(expression)
+                )
+            ).one()
+            if total
+            else None
+        ),
+        items=[model.from_orm(row[0]) for row in rows[:limit]],
+    )
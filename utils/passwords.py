@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from settings import settings
+from utils import metrics
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.password_workers,
+    thread_name_prefix="passwords",
+)
+queued = 0
+
+hashes = metrics.Counter("pollify_password_hashes_total", "Password hashes computed")
+waits = metrics.Counter(
+    "pollify_password_wait_seconds_total",
+    "Time password hashes spent queued for a worker",
+)
+upgrades = metrics.Counter(
+    "pollify_password_upgrades_total",
+    "Stored password hashes upgraded on login",
+)
+depth = metrics.Gauge("pollify_password_queue_depth", "Password hashes waiting")
+depth.track(lambda: queued)
+
+
+def legacy(password: str, salt: str) -> str:
+    return hashlib.sha512((password + salt).encode("UTF-8")).hexdigest()
+
+
+def scrypt(password: str, salt: str, n: int, r: int, p: int) -> str:
+    digest = hashlib.scrypt(
+        password.encode("UTF-8"),
+        salt=salt.encode("UTF-8"),
+        n=n,
+        r=r,
+        p=p,
+        maxmem=2 * 128 * n * r * p,
+    )
+    return f"scrypt${n}${r}${p}${digest.hex()}"
+
+
+def parameters(stored: str | None) -> tuple[int, int, int]:
+    if stored is None:
+        return (
+            settings.password_scrypt_n,
+            settings.password_scrypt_r,
+            settings.password_scrypt_p,
+        )
+
+    n, r, p = stored.split("$")[1:4]
+    return int(n), int(r), int(p)
+
+
+def dequeue(submitted: float, started: float) -> None:
+    global queued
+    queued -= 1
+    waits.inc(started - submitted)
+
+
+def compute(
+    loop: asyncio.AbstractEventLoop,
+    password: str,
+    salt: str,
+    stored: str | None,
+    submitted: float,
+) -> str:
+    loop.call_soon_threadsafe(dequeue, submitted, perf_counter())
+    return scrypt(password, salt, *parameters(stored))
+
+
+async def run(password: str, salt: str, stored: str | None) -> str:
+    global queued
+    queued += 1
+    loop = asyncio.get_running_loop()
+    digest = await loop.run_in_executor(
+        executor,
+        compute,
+        loop,
+        password,
+        salt,
+        stored,
+        perf_counter(),
+    )
+    hashes.inc()
+    return digest
+
+
+def outdated(stored: str) -> bool:
+    return not stored.startswith("scrypt$") or parameters(stored) != parameters(None)
+
+
+async def hash(password: str, salt: str) -> str:
+    return await run(password, salt, None)
+
+
+async def dummy(password: str) -> bool:
+    await run(password, "", None)
+    return False
+
+
+async def verify(password: str, salt: str, stored: str) -> bool:
+    if not stored.startswith("scrypt$"):
+        return hmac.compare_digest(stored, legacy(password, salt))
+    return hmac.compare_digest(stored, await run(password, salt, stored))
@@ -0,0 +1,102 @@
+import hashlib
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+import database
+from models import account, answers, poll
+from settings import settings
+from utils import broadcast, cache
+
+
+class Entry(NamedTuple):
+    version: int
+    model: poll.Poll
+    body: bytes
+    etag: str
+
+
+parsed: cache.Cache[int, Entry] = cache.Cache(
+    "polls",
+    settings.poll_cache_size,
+    settings.poll_cache_ttl,
+)
+
+
+def entry(row: database.Poll) -> Entry:
+    cached = parsed.get(row.id)
+    if (
+        cached is not None
+        and cached.version == row.version
+        and cached.model.owner == account.User.from_orm(row.owner)
+    ):
+        return cached
+
+    model = poll.Poll.from_orm(row)
+    model.poll.checks
+    body = model.json().encode("UTF-8")
+    cached = Entry(
+        row.version,
+        model,
+        body,
+        f'"{hashlib.sha256(body).hexdigest()}"',
+    )
+    parsed.set(row.id, cached)
+    return cached
+
+
+def parse(row: database.Poll) -> poll.Poll:
+    return entry(row).model
+
+
+def build(row: database.Poll, owner: database.User) -> poll.Poll:
+    return poll.Poll(id=row.id, owner=account.User.from_orm(owner), poll=row.poll)
+
+
+async def load(session: AsyncSession, poll_id: int) -> Entry | None:
+    cached = parsed.get(poll_id)
+    if cached is not None:
+        return cached
+
+    row = await session.scalar(
+        select(database.Poll)
+        .options(joinedload(database.Poll.owner))
+        .where(database.Poll.id == poll_id)
+    )
+    return entry(row) if row is not None else None
+
+
+async def get(session: AsyncSession, poll_id: int) -> poll.Poll | None:
+    cached = await load(session, poll_id)
+    return cached.model if cached is not None else None
+
+
+async def owned(
+    session: AsyncSession,
+    poll_id: int,
+    owner_id: int,
+) -> poll.Poll | None:
+    model = await get(session, poll_id)
+    return model if model is not None and model.owner.id == owner_id else None
+
+
+def answer(row: database.Answer, poll_model: poll.Poll) -> answers.Answer:
+    return answers.Answer(
+        id=row.id,
+        poll=poll_model,
+        answerer=(
+            account.User.from_orm(row.answerer) if row.answerer is not None else None
+        ),
+        answer=row.answer,
+    )
+
+
+async def invalidate(poll_id: int) -> None:
+    parsed.pop(poll_id)
+    await broadcast.backend.publish("polls", str(poll_id))
+
+
+broadcast.channels["polls"] = lambda message: parsed.pop(int(message))
+broadcast.resyncs.append(parsed.clear)
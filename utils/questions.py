@@ -0,0 +1,63 @@
+import asyncio
+from uuid import UUID
+
+import database
+from settings import settings
+from utils import broadcast, cache, polls, queues
+
+current: cache.Cache[int, str] = cache.Cache(
+    "questions",
+    settings.question_cache_size,
+    settings.question_cache_ttl,
+)
+pull: dict[int, set[queues.BoundedQueue[str]]] = {}
+resolving: dict[int, asyncio.Task[None]] = {}
+
+
+def present(poll_id: int, frame: str) -> None:
+    current.set(poll_id, frame)
+    for queue in (q for q in pull.get(poll_id, ())):
+        queue.put_nowait(frame)
+
+
+async def resolve(poll_id: int, question_id: UUID) -> None:
+    async with database.sessions.begin() as session:
+        poll_model = await polls.get(session, poll_id)
+
+    resolving.pop(poll_id, None)
+    if poll_model is not None and question_id in poll_model.poll.uuids:
+        present(poll_id, poll_model.poll.uuids[question_id].json())
+
+
+def dispatch(message: str) -> None:
+    poll_id, frame = message.split("\n", 1)
+    key = int(poll_id)
+
+    if key in resolving:
+        resolving.pop(key).cancel()
+
+    if frame == "":
+        current.pop(key)
+    elif frame.startswith("{"):
+        present(key, frame)
+    else:
+        resolving[key] = asyncio.get_running_loop().create_task(
+            resolve(key, UUID(frame))
+        )
+
+
+async def publish(poll_id: int, frame: str, question_id: UUID | None = None) -> None:
+    message = f"{poll_id}\n{frame}"
+    if (
+        question_id is not None
+        and len(message.encode("UTF-8")) > broadcast.backend.max_payload
+    ):
+        message = f"{poll_id}\n{question_id}"
+    await broadcast.backend.publish("questions", message)
+
+
+async def clear(poll_id: int) -> None:
+    await publish(poll_id, "")
+
+
+broadcast.channels["questions"] = dispatch
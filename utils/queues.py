@@ -0,0 +1,53 @@
+from asyncio import Queue
+from typing import Generic, TypeVar
+
+from settings import settings
+from utils import metrics
+
+Item = TypeVar("Item")
+
+overflows = metrics.Counter(
+    "pollify_listen_overflows_total",
+    "Listener queue overflows by policy",
+)
+evictions = metrics.Counter(
+    "pollify_listen_evictions_total",
+    "Listeners disconnected for being too slow",
+)
+
+
+class BoundedQueue(Queue[Item], Generic[Item]):
+    def __init__(
+        self,
+        resync: Item,
+        maxsize: int = settings.listen_queue_size,
+        policy: str = settings.listen_overflow,
+    ) -> None:
+        super().__init__(maxsize)
+        self.resync = resync
+        self.policy = policy
+        self.evicted = False
+
+    def clear(self) -> None:
+        while not self.empty():
+            self.get_nowait()
+
+    def put_nowait(self, item: Item) -> None:
+        if self.evicted:
+            return
+        if not self.full():
+            return super().put_nowait(item)
+
+        overflows.inc(policy=self.policy)
+        match self.policy:
+            case "drop_oldest":
+                self.get_nowait()
+                super().put_nowait(item)
+            case "resync":
+                self.clear()
+                super().put_nowait(self.resync)
+            case "disconnect":
+                evictions.inc()
+                self.evicted = True
+                self.clear()
+                super().put_nowait(self.resync)
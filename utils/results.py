@@ -0,0 +1,139 @@
+from uuid import UUID
+
+from sqlalchemy import and_, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+from models import answers, poll, results
+from utils import values
+
+
+async def reset(session: AsyncSession, poll_id: int, schema: poll.PollSchema) -> None:
+    await session.execute(
+        delete(database.Result).where(database.Result.poll_id == poll_id)
+    )
+    await create(session, poll_id, schema, set(schema.uuids))
+
+
+async def create(
+    session: AsyncSession,
+    poll_id: int,
+    schema: poll.PollSchema,
+    question_ids: set[UUID],
+) -> None:
+    if len(question_ids) == 0:
+        return
+
+    dialect = postgresql if database.engine.dialect.name == "postgresql" else sqlite
+    uuids = schema.uuids
+    await session.execute(
+        dialect.insert(database.Result)  # type: ignore[attr-defined]
+        .values(
+            [
+                {
+                    "poll_id": poll_id,
+                    "question_id": question_id,
+                    "result": results.empty(uuids[question_id]).serializable(),
+                }
+                for question_id in question_ids
+            ]
+        )
+        .on_conflict_do_nothing(
+            index_elements=[database.Result.poll_id, database.Result.question_id]
+        )
+    )
+
+
+async def locked(
+    session: AsyncSession,
+    poll_id: int,
+    question_ids: set[UUID],
+) -> dict[UUID, database.Result]:
+    return {
+        row.question_id: row
+        for row in await session.scalars(
+            select(database.Result)
+            .where(
+                and_(
+                    database.Result.poll_id == poll_id,
+                    database.Result.question_id.in_(question_ids),
+                )
+            )
+            .with_for_update()
+        )
+    }
+
+
+async def apply(
+    session: AsyncSession,
+    poll_model: poll.Poll,
+    values: list[answers.Value],
+) -> dict[UUID, int]:
+    if len(values) == 0:
+        return {}
+
+    question_ids = {value.question_id for value in values}
+    rows = await locked(session, poll_model.id, question_ids)
+    if rows.keys() != question_ids:
+        await create(
+            session, poll_model.id, poll_model.poll, question_ids - rows.keys()
+        )
+        rows = await locked(session, poll_model.id, question_ids)
+
+    updated: dict[UUID, results.Result] = {}
+    for value in values:
+        if value.question_id not in updated:
+            updated[value.question_id] = results.parse(rows[value.question_id].result)
+        updated[value.question_id].add(value)  # type: ignore[arg-type]
+
+    for question_id, result in updated.items():
+        rows[question_id].result = result.serializable()
+    return {question_id: result.total for question_id, result in updated.items()}
+
+
+async def rebuild(session: AsyncSession, poll_model: poll.Poll) -> None:
+    await session.execute(
+        select(database.Poll.id)
+        .where(database.Poll.id == poll_model.id)
+        .with_for_update()
+    )
+    stored = set(
+        await session.scalars(
+            select(database.Result.question_id).where(
+                database.Result.poll_id == poll_model.id
+            )
+        )
+    )
+    if stored == poll_model.poll.uuids.keys():
+        return
+
+    await reset(session, poll_model.id, poll_model.poll)
+
+    await apply(
+        session,
+        poll_model,
+        [
+            values.parse(value)
+            for value in await session.scalars(
+                select(database.AnswerValue).where(
+                    database.AnswerValue.poll_id == poll_model.id
+                )
+            )
+        ],
+    )
+
+
+async def get(session: AsyncSession, poll_model: poll.Poll) -> list[results.Result]:
+    rows = {
+        row.question_id: row.result
+        for row in await session.scalars(
+            select(database.Result).where(database.Result.poll_id == poll_model.id)
+        )
+    }
+
+    if rows.keys() != poll_model.poll.uuids.keys():
+        await rebuild(session, poll_model)
+        return await get(session, poll_model)
+
+    return [results.parse(rows[question_id]) for question_id in poll_model.poll.uuids]
@@ -0,0 +1,133 @@
+import asyncio
+import secrets
+from collections import Counter, deque
+from uuid import UUID
+
+from pydantic import parse_raw_as
+
+import database
+from models import answers, results
+from settings import settings
+from utils import broadcast, polls
+from utils import results as stored
+
+resync = answers.Resync().json()
+
+
+def delta(seq: int, frame: str) -> str:
+    return f'{{"seq":{seq},"value":{frame}}}'
+
+
+class Stream:
+    def __init__(self, poll_id: int) -> None:
+        self.poll_id = poll_id
+        self.seq = secrets.randbits(20) << 32
+        self.frames: deque[tuple[int, str]] = deque(maxlen=settings.listen_resume_size)
+        self.results: dict[UUID, results.Result] | None = None
+        self.covered: dict[UUID, int] = {}
+        self.pending: list[tuple[int, answers.Value]] = []
+        self.encoded: tuple[int, str] | None = None
+        self.loading = asyncio.get_running_loop().create_task(self.load())
+
+    async def load(self) -> None:
+        async with database.sessions.begin() as session:
+            poll_model = await polls.get(session, self.poll_id)
+            loaded = (
+                await stored.get(session, poll_model) if poll_model is not None else []
+            )
+
+        self.results = {result.question_id: result for result in loaded}
+        self.covered = {result.question_id: result.total for result in loaded}
+        for position, value in self.pending:
+            self.apply(position, value)
+        self.pending = []
+        self.encoded = None
+
+    def apply(self, position: int, value: answers.Value) -> bool:
+        if self.results is None:
+            self.pending.append((position, value))
+            return True
+        if position <= self.covered.get(value.question_id, position):
+            return False
+        self.results[value.question_id].add(value)  # type: ignore[arg-type]
+        return True
+
+    def push(self, frame: str) -> str | None:
+        position, body = frame.split(" ", 1)
+        value: answers.Value = parse_raw_as(
+            answers.Value, body  # type: ignore[arg-type]
+        )
+        if not self.apply(int(position), value):
+            return None
+
+        self.seq += 1
+        message = delta(self.seq, body)
+        self.frames.append((self.seq, message))
+        return message
+
+    def reset(self) -> None:
+        self.seq += 1
+        self.frames.clear()
+        self.results = None
+        self.covered = {}
+        self.pending = []
+        self.encoded = None
+        self.loading = asyncio.get_running_loop().create_task(self.load())
+
+    def since(self, seq: int) -> list[str] | None:
+        if seq == self.seq:
+            return []
+        if len(self.frames) == 0 or not self.frames[0][0] - 1 <= seq < self.seq:
+            return None
+        return [message for frame_seq, message in self.frames if frame_seq > seq]
+
+    def snapshot(self) -> str:
+        if self.encoded is None or self.encoded[0] != self.seq:
+            self.encoded = (
+                self.seq,
+                results.Snapshot(
+                    seq=self.seq,
+                    results=list((self.results or {}).values()),
+                ).json(),
+            )
+        return self.encoded[1]
+
+
+streams: dict[int, Stream] = {}
+
+
+def encode(values: list[answers.Value], totals: dict[UUID, int]) -> list[str]:
+    remaining = Counter(value.question_id for value in values)
+    frames: list[str] = []
+    for value in values:
+        remaining[value.question_id] -= 1
+        position = totals[value.question_id] - remaining[value.question_id]
+        frames.append(f"{position} {value.json()}")
+    return frames
+
+
+async def publish(
+    poll_id: int,
+    values: list[answers.Value],
+    totals: dict[UUID, int],
+) -> None:
+    frames = encode(values, totals)
+    if any(
+        len(frame.encode("UTF-8")) > broadcast.backend.max_payload for frame in frames
+    ):
+        frames = [resync]
+
+    for message in broadcast.pack(frames, broadcast.backend.max_payload):
+        await broadcast.backend.publish(f"values_{poll_id}", message)
+
+
+async def reset(poll_id: int) -> None:
+    await broadcast.backend.publish(f"values_{poll_id}", resync)
+
+
+def resync_all() -> None:
+    for poll_id in list(streams):
+        broadcast.backend.dispatch(f"values_{poll_id}", resync)
+
+
+broadcast.resyncs.append(resync_all)
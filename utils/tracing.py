@@ -0,0 +1,181 @@
+import asyncio
+import os
+import re
+import sys
+import threading
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter, time
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from settings import settings
+from utils import metrics
+
+request_seconds = metrics.Histogram(
+    "pollify_request_seconds",
+    "Request latency by route",
+)
+request_queries = metrics.Histogram(
+    "pollify_request_queries",
+    "SQL queries per request",
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+request_sql_seconds = metrics.Histogram(
+    "pollify_request_sql_seconds",
+    "Time spent in SQL per request",
+)
+request_pool_seconds = metrics.Histogram(
+    "pollify_request_pool_wait_seconds",
+    "Time spent waiting for a pooled connection per request",
+)
+query_seconds = metrics.Histogram("pollify_sql_query_seconds", "SQL query latency")
+profiles = metrics.Counter("pollify_profiles_total", "Slow request profiles written")
+
+
+@dataclass
+class Trace:
+    queries: int = 0
+    sql_seconds: float = 0
+    pool_seconds: float = 0
+
+
+current: ContextVar[Trace | None] = ContextVar("trace", default=None)
+
+
+def before_execute(connection: Any, *args: Any) -> None:
+    connection.info["query_start"] = perf_counter()
+
+
+def after_execute(connection: Any, *args: Any) -> None:
+    elapsed = perf_counter() - connection.info.pop("query_start")
+    query_seconds.observe(elapsed)
+    trace = current.get()
+    if trace is not None:
+        trace.queries += 1
+        trace.sql_seconds += elapsed
+
+
+def instrument(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", before_execute)
+    event.listen(engine, "after_cursor_execute", after_execute)
+
+
+def waited(seconds: float) -> None:
+    trace = current.get()
+    if trace is not None:
+        trace.pool_seconds += seconds
+
+
+def stack(frame: FrameType | None) -> str:
+    frames: list[str] = []
+    while frame is not None:
+        frames.append(f"{frame.f_globals.get('__name__')}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class Sampler:
+    def __init__(self) -> None:
+        self.samples: deque[tuple[float, str]] = deque(maxlen=settings.profile_samples)
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.target = 0
+
+    def start(self) -> None:
+        if not settings.profile or self.thread is not None:
+            return
+
+        os.makedirs(settings.profile_directory, exist_ok=True)
+        self.target = threading.get_ident()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while not self.stopped.wait(settings.profile_interval):
+            frame = sys._current_frames().get(self.target)
+            self.samples.append((perf_counter(), stack(frame)))
+
+    def collapse(self, start: float, end: float) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for moment, frames in list(self.samples):
+            if start <= moment <= end:
+                counts[frames] = counts.get(frames, 0) + 1
+        return counts
+
+    def dump(self, method: str, route: str, start: float, end: float) -> None:
+        counts = self.collapse(start, end)
+        if len(counts) == 0:
+            return
+
+        name = re.sub(r"\W+", "_", route).strip("_") or "root"
+        path = os.path.join(
+            settings.profile_directory,
+            f"{int(time() * 1000)}-{method.lower()}-{name}.folded",
+        )
+        with open(path, "w") as file:
+            file.writelines(f"{frames} {count}\n" for frames, count in counts.items())
+        profiles.inc()
+
+    def close(self) -> None:
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+
+
+sampler = Sampler()
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.paths: dict[Any, str] = {}
+
+    def route(self, scope: Scope) -> str:
+        if len(self.paths) == 0:
+            self.paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self.paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        trace = Trace()
+        token = current.set(trace)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            end = perf_counter()
+            current.reset(token)
+
+            route = self.route(scope)
+            method = scope["method"]
+            request_seconds.observe(
+                end - start, route=route, method=method, status=str(status)
+            )
+            request_queries.observe(trace.queries, route=route, method=method)
+            request_sql_seconds.observe(trace.sql_seconds, route=route, method=method)
+            request_pool_seconds.observe(trace.pool_seconds, route=route, method=method)
+
+            if sampler.thread is not None and end - start >= settings.profile_threshold:
+                await asyncio.to_thread(sampler.dump, method, route, start, end)
@@ -0,0 +1,46 @@
+from typing import Any
+
+from pydantic import parse_obj_as
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+from models import answers
+
+
+def row(answer_id: int, poll_id: int, value: answers.Value) -> dict[str, Any]:
+    payload = value.serializable()
+    del payload["question_id"], payload["question_type"]
+    return {
+        "answer_id": answer_id,
+        "poll_id": poll_id,
+        "question_id": value.question_id,
+        "question_type": value.question_type.value,
+        "value": payload,
+    }
+
+
+async def add(
+    session: AsyncSession,
+    answer_id: int,
+    poll_id: int,
+    values: list[answers.Value],
+) -> None:
+    if len(values) == 0:
+        return
+
+    await session.execute(
+        insert(database.AnswerValue),
+        [row(answer_id, poll_id, value) for value in values],
+    )
+
+
+def parse(value: database.AnswerValue) -> answers.Value:
+    return parse_obj_as(
+        answers.Value,  # type: ignore[arg-type]
+        {
+            "question_id": value.question_id,
+            "question_type": value.question_type,
+            **value.value,
+        },
+    )